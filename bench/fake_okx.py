@@ -0,0 +1,228 @@
+"""
+Stand-in HTTP OKX lokal untuk benchmark & uji offline.
+
+    python -m bench.fake_okx --port 8900 --latency 0.08 --error-rate 0.02
+    OKX_BASE_URL=http://127.0.0.1:8900 streamlit run context_gate_app.py
+
+Payload:
+- Rekaman (`--fixtures DIR`): file {endpoint}__{instId}.json berisi
+  respons OKX utuh, misal market_candles__BTC-USDT-SWAP.json.
+  Buat rekaman dengan: python -m bench.fake_okx record BTC ETH SOL
+- Tanpa rekaman: data sintetis deterministik per instId.
+Base yang diawali "ZZ" dianggap tidak ada (menguji instrument fallback).
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+BAR_MS = {"1m": 60_000, "5m": 5 * 60_000, "15m": 15 * 60_000,
+          "1H": 60 * 60_000, "4H": 4 * 60 * 60_000}
+SYNTH_BARS = 1440   # = histori /market/candles OKX
+SYNTH_BASES = ["BTC", "ETH", "SOL", "XRP", "DOGE", "BNB", "ADA", "AVAX", "LINK", "SUI"]
+
+ENDPOINTS = {
+    "/api/v5/market/candles": "market_candles",
+    "/api/v5/market/ticker": "market_ticker",
+    "/api/v5/market/tickers": "market_tickers",
+    "/api/v5/public/open-interest-history": "public_open-interest-history",
+    "/api/v5/public/instruments": "public_instruments",
+    "/api/v5/public/mark-price": "public_mark-price",
+}
+
+# ==================================================
+# SYNTHETIC PAYLOADS (DETERMINISTIK PER INSTRUMEN)
+# ==================================================
+def _rng(inst):
+    return np.random.default_rng(int(hashlib.md5(inst.encode()).hexdigest()[:8], 16))
+
+def synth_candles(inst, limit, bar="15m", after=None):
+    rng = _rng(inst if bar == "15m" else f"{inst}{bar}")
+    bar_ms = BAR_MS[bar]
+    now = int(time.time() * 1000) // bar_ms * bar_ms
+    price = rng.uniform(0.1, 50_000)
+    close = price * np.exp(np.cumsum(rng.normal(0, 0.003, SYNTH_BARS)))
+    spread = close * rng.gamma(2, 0.002, SYNTH_BARS)
+    vol = rng.gamma(2, 5e5, SYNTH_BARS)
+
+    # after (paginasi OKX): hanya candle dengan ts < after
+    first = 0 if after is None else max(0, (now - int(after)) // bar_ms + 1)
+    rows = []
+    for i in range(first, min(first + limit, SYNTH_BARS)):
+        j = SYNTH_BARS - 1 - i  # terbaru dulu
+        c, s, v = close[j], spread[j], vol[j]
+        rows.append([
+            str(now - i * bar_ms), f"{c:.6g}", f"{c + s / 2:.6g}", f"{c - s / 2:.6g}",
+            f"{c:.6g}", f"{v / c:.6g}", f"{v / c:.6g}", f"{v:.6g}", "0" if i == 0 else "1"
+        ])
+    return rows
+
+def synth_ticker(inst):
+    rng = _rng(inst)
+    candles = synth_candles(inst, 96)
+    vol_24h = sum(float(r[7]) for r in candles) * rng.uniform(0.6, 1.6)
+    last = candles[0][4]
+    return {
+        "instType": "SWAP", "instId": inst, "last": last, "markPx": last,
+        "volCcy24h": f"{vol_24h:.6g}", "vol24h": f"{vol_24h / float(last):.6g}",
+        "ts": candles[0][0]
+    }
+
+def synth_oi(inst, limit, period="15m"):
+    rng = _rng(inst + "oi" + ("" if period == "15m" else period))
+    bar_ms = BAR_MS[period]
+    now = int(time.time() * 1000) // bar_ms * bar_ms
+    oi = 1e6 * np.exp(np.cumsum(rng.normal(0, 0.01, limit)))
+    return [{"instId": inst, "oi": f"{oi[i]:.6g}", "ts": str(now - i * bar_ms)} for i in range(limit)]
+
+def synth_instruments():
+    return [
+        {
+            "instType": "SWAP", "instId": f"{b}-USDT-SWAP", "uly": f"{b}-USDT",
+            "ctVal": "0.01", "ctValCcy": b, "tickSz": "0.1", "lotSz": "1",
+            "settleCcy": "USDT", "state": "live"
+        }
+        for b in SYNTH_BASES
+    ]
+
+# ==================================================
+# HTTP HANDLER
+# ==================================================
+class FakeOKXHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    jitter = 0.0
+    error_rate = 0.0
+    fixtures = None
+    counter = {"requests": 0}
+    counter_lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _fixture(self, name, inst):
+        if not self.fixtures:
+            return None
+        path = os.path.join(self.fixtures, f"{name}__{inst or 'all'}.json")
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+        return None
+
+    def do_GET(self):
+        with self.counter_lock:
+            self.counter["requests"] += 1
+
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+
+        if random.random() < self.error_rate:
+            self._send(random.choice([429, 500]), {"code": "50011", "msg": "fake error", "data": []})
+            return
+
+        url = urlparse(self.path)
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        inst = q.get("instId")
+        limit = int(q.get("limit", 100))
+
+        name = ENDPOINTS.get(url.path)
+        if name is None:
+            self._send(404, {"code": "404", "msg": "not found", "data": []})
+            return
+
+        recorded = self._fixture(name, inst)
+        if recorded is not None:
+            self._send(200, recorded)
+            return
+
+        if inst and inst.startswith("ZZ"):
+            self._send(200, {"code": "51001", "msg": "Instrument ID does not exist", "data": []})
+            return
+
+        if name == "market_candles":
+            data = synth_candles(inst, limit, q.get("bar", "15m"), q.get("after"))
+        elif name == "market_ticker":
+            data = [synth_ticker(inst)]
+        elif name == "market_tickers":
+            data = [synth_ticker(i["instId"]) for i in synth_instruments()]
+        elif name == "public_mark-price":
+            data = [
+                {"instType": "SWAP", "instId": t["instId"], "markPx": t["markPx"], "ts": t["ts"]}
+                for t in (synth_ticker(i["instId"]) for i in synth_instruments())
+            ]
+        elif name == "public_open-interest-history":
+            data = synth_oi(inst, limit, q.get("period", "15m"))
+        else:
+            data = synth_instruments()
+
+        self._send(200, {"code": "0", "msg": "", "data": data})
+
+def serve(host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0, fixtures=None):
+    """Jalankan server di thread background. port=0 → port acak."""
+    FakeOKXHandler.latency = latency
+    FakeOKXHandler.jitter = jitter
+    FakeOKXHandler.error_rate = error_rate
+    FakeOKXHandler.fixtures = fixtures
+
+    server = ThreadingHTTPServer((host, port), FakeOKXHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# ==================================================
+# RECORD PAYLOAD ASLI → FIXTURES
+# ==================================================
+def record(bases, out_dir):
+    import requests
+
+    os.makedirs(out_dir, exist_ok=True)
+    for base in bases:
+        inst = f"{base}-USDT-SWAP"
+        for path, params in [
+            ("/api/v5/market/candles", {"instId": inst, "bar": "15m", "limit": 96}),
+            ("/api/v5/market/ticker", {"instId": inst}),
+            ("/api/v5/public/open-interest-history", {"instId": inst, "period": "15m", "limit": 6}),
+        ]:
+            payload = requests.get(f"https://www.okx.com{path}", params=params, timeout=10).json()
+            with open(os.path.join(out_dir, f"{ENDPOINTS[path]}__{inst}.json"), "w") as f:
+                json.dump(payload, f)
+            print(f"{path} {inst}: code {payload.get('code')}")
+
+# ==================================================
+# CLI
+# ==================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake OKX REST server")
+    parser.add_argument("command", nargs="?", default="serve", choices=["serve", "record"])
+    parser.add_argument("bases", nargs="*", help="(record) simbol dasar, misal BTC ETH")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.0, help="detik per request")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--fixtures", help="folder payload rekaman")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.bases, args.fixtures or "bench/fixtures")
+    else:
+        srv = serve(args.host, args.port, args.latency, args.jitter, args.error_rate, args.fixtures)
+        print(f"Fake OKX di http://{args.host}:{srv.server_address[1]}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            srv.shutdown()
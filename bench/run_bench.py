@@ -0,0 +1,270 @@
+"""
+Benchmark hot path: fetch OKX (fetch_markets + MarketCache + candle store),
+label context, get_context_gate_pairs,
+simpan/muat jurnal (1k / 100k / 1M baris), ekspor Parquet jurnal trade.
+
+    python -m bench.run_bench --out bench_results.json
+    python -m bench.run_bench --quick --compare bench_results.json
+
+Semua I/O ke folder sementara; OKX diganti bench.fake_okx.
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from bench.fake_okx import serve, synth_candles, synth_oi, synth_ticker
+from mbokmenowo.candle_store import CandleStore, sync_candles
+from mbokmenowo.columnar import export_journal, load
+from mbokmenowo.context_engine import evaluate_batch
+from mbokmenowo.journal_store import CONTEXT_JOURNAL, TRADE_JOURNAL, CsvJournal, SqliteJournal
+from mbokmenowo.market import fetch_markets
+from mbokmenowo.market_cache import MarketCache
+from mbokmenowo.okx_client import OKXClient
+
+# ==================================================
+# TIMING
+# ==================================================
+def measure(fn, repeat=5, warmup=1):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1000)
+    samples.sort()
+    return {
+        "n": repeat,
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))],
+        "min_ms": samples[0]
+    }
+
+# ==================================================
+# BENCH: FETCH PATH
+# ==================================================
+def bench_fetch(results, workdir, latency, pairs):
+    """Jalur fetch aplikasi: fetch_markets → MarketCache → sync_candles / ticker / OI."""
+    server = serve(latency=latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    client = OKXClient(base_url=base_url)
+    store = CandleStore(os.path.join(workdir, "candles.db"))
+    bases = [f"P{i}" for i in range(pairs)]
+
+    def ticker(inst):
+        data = client.get_data("/api/v5/market/ticker", {"instId": inst})
+        return data[0] if data else None
+
+    def scan(cache, bases):
+        # Fungsi fetch sama dengan context_gate_app (key & ttl)
+        return fetch_markets(
+            bases,
+            lambda inst: cache.get(
+                ("candles", inst, 96),
+                lambda: sync_candles(client, store, inst, "15m", 96), ttl=60
+            ),
+            lambda inst: cache.get(("ticker", inst), lambda: ticker(inst), ttl=60),
+            lambda inst: cache.get(
+                ("oi", inst, 6, "15m"),
+                lambda: client.get_data(
+                    "/api/v5/public/open-interest-history",
+                    {"instId": inst, "period": "15m", "limit": 6}
+                ),
+                ttl=300
+            )
+        )
+
+    def cold(bases):
+        # Cache kosong: semua key miss → request OKX (candle incremental dari store)
+        cache = MarketCache()
+        try:
+            scan(cache, bases)
+        finally:
+            cache.close()
+
+    results["fetch.single_pair"] = measure(lambda: cold(bases[:1]))
+    results[f"fetch.scan_{pairs}_pairs"] = measure(lambda: cold(bases), repeat=3)
+
+    warm = MarketCache()
+    results[f"fetch.scan_{pairs}_pairs_cached"] = measure(lambda: scan(warm, bases))
+    warm.close()
+
+    results["fetch.candles_incremental_warm"] = measure(
+        lambda: sync_candles(client, store, f"{bases[0]}-USDT-SWAP", "15m", 96)
+    )
+
+    server.shutdown()
+
+# ==================================================
+# BENCH: LABEL COMPUTATION
+# ==================================================
+def bench_labels(results, sizes=(1, 100, 500)):
+    for n in sizes:
+        insts = [f"L{i}-USDT-SWAP" for i in range(n)]
+        candles = [synth_candles(i, 96) for i in insts]
+        tickers = [synth_ticker(i) for i in insts]
+        ois = [synth_oi(i, 6) for i in insts]
+        results[f"labels.evaluate_batch_{n}"] = measure(
+            lambda: evaluate_batch(candles, tickers, ois)
+        )
+
+# ==================================================
+# BENCH: JOURNAL (CONTEXT GATE PAIRS + SAVE/LOAD)
+# ==================================================
+def _fill_context_csv(path, rows):
+    start = datetime.utcnow() + timedelta(hours=7) - timedelta(minutes=rows)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(list(CONTEXT_JOURNAL["columns"]))
+        for i in range(rows):
+            w.writerow([
+                (start + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M"),
+                f"P{i % 50}", f"P{i % 50}-USDT-SWAP", "Asia", "NORMAL", "RANGE_NORMAL",
+                "OI_INERT", "MIXED", "✅ Layak Dipantau",
+                "TAKEN" if i % 3 == 0 else "SKIPPED", ""
+            ])
+
+def _fill_sqlite(journal, csv_path):
+    journal.migrate_csv(csv_path)
+
+def bench_journal(results, workdir, sizes):
+    since_fmt = "%Y-%m-%d %H:%M"
+
+    for rows in sizes:
+        label = f"{rows // 1000}k" if rows < 1_000_000 else f"{rows // 1_000_000}M"
+
+        csv_path = os.path.join(workdir, f"context_{rows}.csv")
+        _fill_context_csv(csv_path, rows)
+        csv_j = CsvJournal(CONTEXT_JOURNAL, csv_path)
+
+        db_j = SqliteJournal(CONTEXT_JOURNAL, os.path.join(workdir, f"journal_{rows}.db"))
+        _fill_sqlite(db_j, csv_path)
+
+        since = (datetime.utcnow() + timedelta(hours=3)).strftime(since_fmt)
+
+        for name, j in (("csv", csv_j), ("sqlite", db_j)):
+            results[f"context_pairs.{name}_{label}"] = measure(
+                lambda: j.recent_latest("pair", "datetime_wib", since, decision="TAKEN")
+            )
+            row = dict(zip(CONTEXT_JOURNAL["columns"], [
+                datetime.utcnow().strftime(since_fmt), "BTC", "BTC-USDT-SWAP", "Asia",
+                "NORMAL", "RANGE_NORMAL", "OI_INERT", "MIXED", "x", "SKIPPED", ""
+            ]))
+            results[f"journal_save.{name}_{label}"] = measure(lambda: j.append(row), repeat=10)
+            results[f"journal_load.{name}_{label}"] = measure(j.rows, repeat=3 if rows < 1_000_000 else 1)
+
+        # Update satu trade (close / result_r)
+        trade_db = SqliteJournal(TRADE_JOURNAL, os.path.join(workdir, f"journal_{rows}.db"))
+        tid = trade_db.append({"pair": "BTC", "trade_status": "OPEN"})
+        results[f"journal_update.sqlite_{label}"] = measure(
+            lambda: trade_db.update(tid, {"trade_status": "CLOSED"}), repeat=10
+        )
+
+# ==================================================
+# BENCH: EKSPOR PARQUET (JURNAL TRADE)
+# ==================================================
+def bench_export(results, workdir, rows):
+    """
+    Ekspor + load jurnal trade. Timestamp isoformat() bermikrodetik
+    (seperti risk_manager_app) sekaligus cek regresi cast ke timestamp[ms].
+    """
+    label = f"{rows // 1000}k"
+    journal = SqliteJournal(TRADE_JOURNAL, os.path.join(workdir, f"trades_{rows}.db"))
+    start = datetime.now()
+    journal.apply([
+        ("insert", None, {
+            "timestamp": (start + timedelta(seconds=i, microseconds=i % 1000 + 1)).isoformat(),
+            "pair": f"P{i % 50}", "direction": "LONG", "trade_status": "CLOSED",
+            "result_r": (i % 7) - 3.0
+        })
+        for i in range(rows)
+    ])
+    root = os.path.join(workdir, "exports")
+
+    results[f"export.trades_parquet_{label}"] = measure(
+        lambda: export_journal(journal, TRADE_JOURNAL, root=root), repeat=3
+    )
+    loaded = load(TRADE_JOURNAL["table"], columns=["timestamp", "pair", "result_r"], root=root)
+    if len(loaded) != rows or loaded["timestamp"].isna().any():
+        raise RuntimeError(f"Ekspor trade tidak utuh: {len(loaded)}/{rows} baris")
+    results[f"export.trades_load_{label}"] = measure(
+        lambda: load(TRADE_JOURNAL["table"], columns=["timestamp", "pair", "result_r"], root=root)
+    )
+
+# ==================================================
+# COMPARE
+# ==================================================
+def compare(current, baseline_path, threshold):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+
+    regressions = []
+    print(f"{'benchmark':45} {'baseline':>10} {'now':>10} {'ratio':>7}")
+    for name, r in sorted(current.items()):
+        if name not in baseline:
+            continue
+        old, new = baseline[name]["median_ms"], r["median_ms"]
+        ratio = new / old if old else float("inf")
+        flag = "  ⚠️" if ratio > threshold else ""
+        print(f"{name:45} {old:10.2f} {new:10.2f} {ratio:7.2f}{flag}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+# ==================================================
+# CLI
+# ==================================================
+def _git_rev():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Context Gate / Risk Manager")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", help="file JSON hasil sebelumnya")
+    parser.add_argument("--threshold", type=float, default=1.25, help="ratio regresi")
+    parser.add_argument("--quick", action="store_true", help="ukuran jurnal 1k & 10k saja")
+    parser.add_argument("--latency", type=float, default=0.05, help="latency fake OKX (detik)")
+    parser.add_argument("--pairs", type=int, default=40)
+    args = parser.parse_args()
+
+    sizes = (1_000, 10_000) if args.quick else (1_000, 100_000, 1_000_000)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        bench_fetch(results, workdir, args.latency, args.pairs)
+        bench_labels(results)
+        bench_journal(results, workdir, sizes)
+        bench_export(results, workdir, sizes[-1])
+
+    output = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_rev": _git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+            "fake_okx_latency_s": args.latency
+        },
+        "results": results
+    }
+
+    regressions = compare(results, args.compare, args.threshold) if args.compare else []
+
+    with open(args.out, "w") as f:
+        json.dump(output, f, indent=2)
+    print(f"Hasil → {args.out}")
+
+    if regressions:
+        print(f"Regresi: {', '.join(regressions)}")
+        sys.exit(1)
@@ -1,17 +1,39 @@
 import streamlit as st
 import pandas as pd
-import requests
-import numpy as np
+from concurrent.futures import wait
 from datetime import datetime
-import pytz
-import os
 import re
 
+from mbokmenowo.okx_client import get_client
+from mbokmenowo.candle_store import get_store, sync_candles
+from mbokmenowo.columnar import journal_table, parquet_bytes
+from mbokmenowo.okx_stream import get_stream
+from mbokmenowo.journal_service import get_journal_service
+from mbokmenowo.journal_store import CONTEXT_JOURNAL, JOURNAL_BACKEND, ensure_csv_schema
+from mbokmenowo.context_engine import (
+    evaluate_batch, evaluate_one, evaluate_stats, mark_oi_unknown,
+    VERDICT_MONITOR, VERDICT_WATCH, VERDICT_NO_TRADE
+)
+from mbokmenowo.decision_feed import publish_decision
+from mbokmenowo.instruments import get_instruments
+from mbokmenowo.market import fetch_markets, inst_candidates
+from mbokmenowo.market_cache import EVAL_DEADLINE_S, Deadline, get_market_cache
+from mbokmenowo.perf_metrics import (
+    flush_jsonl, is_enabled, recent, set_enabled, span, summary, write_prometheus
+)
+from mbokmenowo.timeframes import (
+    MTF_BARS, OI_BASE_LIMIT, OI_PERIODS,
+    derive_oi, evaluate_timeframes, timeframe_candles
+)
+from mbokmenowo.wib import WIB_FORMAT, trading_session, wib_now
+from streamlit_autorefresh import st_autorefresh
+
 # ==================================================
 # CONFIG
 # ==================================================
-BASE_URL = "https://www.okx.com"
 JOURNAL_FILE = "context_gate_journal.csv"
+STREAM_REFRESH_MS = 2000
+DEFAULT_WATCHLIST = "BTC, ETH, SOL, XRP, DOGE, BNB, ADA, AVAX, LINK, SUI"
 
 st.set_page_config(
     page_title="🧭 Context Gate — OKX Futures",
@@ -25,34 +47,21 @@ st.caption("Context-first • Pair-specific • Bukan sinyal entry")
 # ==================================================
 # EXPECTED JOURNAL SCHEMA (ANTI REGRESI)
 # ==================================================
-EXPECTED_COLUMNS = [
-    "datetime_wib",
-    "pair",
-    "inst_id",
-    "session",
-    "rv_label",
-    "rvol_label",
-    "oi_label",
-    "behavior",
-    "verdict",
-    "decision",
-    "note"
-]
+EXPECTED_COLUMNS = list(CONTEXT_JOURNAL["columns"])
 
 # ==================================================
 # INIT / VALIDATE JOURNAL
 # ==================================================
-if not os.path.exists(JOURNAL_FILE):
-    pd.DataFrame(columns=EXPECTED_COLUMNS).to_csv(JOURNAL_FILE, index=False)
-else:
-    df_existing = pd.read_csv(JOURNAL_FILE)
-    if list(df_existing.columns) != EXPECTED_COLUMNS:
-        backup_name = JOURNAL_FILE.replace(
-            ".csv",
-            f"_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        )
-        df_existing.to_csv(backup_name, index=False)
-        pd.DataFrame(columns=EXPECTED_COLUMNS).to_csv(JOURNAL_FILE, index=False)
+if JOURNAL_BACKEND == "csv":
+    # Hanya header yang dibaca; schema beda → file lama di-rename jadi backup
+    ensure_csv_schema(
+        JOURNAL_FILE,
+        EXPECTED_COLUMNS,
+        datetime.now().strftime('%Y%m%d_%H%M%S')
+    )
+
+# Satu writer per proses untuk semua sesi / tab (write diantre & di-batch)
+journal = get_journal_service(CONTEXT_JOURNAL)
 
 # ==================================================
 # LABEL TRANSLATION (UI ONLY)
@@ -69,6 +78,7 @@ LABEL_ID = {
     "OI_BUILDING": "Posisi futures sedang dibangun",
     "OI_UNWINDING": "Posisi futures sedang ditutup",
     "OI_INERT": "Minat futures stagnan",
+    "OI_UNKNOWN": "Data OI belum tiba (OKX lambat)",
 
     "ACCUMULATION_LIKE": "Indikasi akumulasi",
     "HEALTHY_PARTICIPATION": "Partisipasi sehat",
@@ -77,177 +87,363 @@ LABEL_ID = {
     "MIXED": "Perilaku campuran"
 }
 
-# ==================================================
-# PAIR INPUT (SIMPEL & CEPAT)
-# ==================================================
-base_asset = st.text_input(
-    "Pair Futures (cukup simbol dasar, contoh: BTC, ETH, SOL)",
-    value="BTC"
-).upper().strip()
+# Urutan ranking scanner (terbaik di atas)
+VERDICT_RANK = {
+    VERDICT_MONITOR: 0,
+    VERDICT_WATCH: 1,
+    VERDICT_NO_TRADE: 2
+}
 
-if not re.match(r"^[A-Z]{2,10}$", base_asset):
-    st.error("Format pair tidak valid.")
-    st.stop()
+SCAN_COLUMNS = [
+    "pair", "inst_id", "verdict", "behavior",
+    "rv_label", "rvol_label", "oi_label", "rv_ratio", "rvol_ratio"
+]
 
 # ==================================================
 # OKX API FUNCTIONS
 # ==================================================
-@st.cache_data(ttl=60)
-def get_candles(inst, limit=96):
-    r = requests.get(
-        f"{BASE_URL}/api/v5/market/candles",
-        params={"instId": inst, "bar": "15m", "limit": limit},
-        timeout=10
-    ).json()
-    return r["data"] if r.get("code") == "0" else []
-
-@st.cache_data(ttl=60)
-def get_ticker(inst):
-    r = requests.get(
-        f"{BASE_URL}/api/v5/market/ticker",
-        params={"instId": inst},
-        timeout=10
-    ).json()
-    return r["data"][0] if r.get("code") == "0" else None
-
-@st.cache_data(ttl=300)
-def get_oi_history(inst, limit=6):
-    r = requests.get(
-        f"{BASE_URL}/api/v5/public/open-interest-history",
-        params={"instId": inst, "period": "15m", "limit": limit},
-        timeout=10
-    ).json()
-    return r["data"] if r.get("code") == "0" else []
-
-# ==================================================
-# INSTRUMENT FALLBACK (ROBUST)
-# ==================================================
-inst_candidates = [
-    f"{base_asset}-USDT-SWAP",
-    f"{base_asset}-USD-SWAP"
-]
+okx = get_client()
+candle_store = get_store()
+
+# Stale-while-revalidate: data terakhir langsung tampil, refresh di
+# background. Miss menunggu paling lama sampai deadline evaluasi ini.
+market_cache = get_market_cache()
+deadline = Deadline(EVAL_DEADLINE_S)
 
-candles = None
-ticker = None
-oi_hist = []
-inst_used = None
+# Index SWAP dari disk; refresh harian (1 request) berjalan di background.
+# Index belum ada sama sekali → tunggu paling lama sampai deadline,
+# selebihnya kandidat ditebak (USDT lalu USD).
+instruments = get_instruments()
+if instruments.is_stale():
+    refresh = market_cache.refresh(("instruments", "SWAP"), lambda: instruments.refresh(okx))
+    if not instruments:
+        wait([refresh], timeout=deadline.remaining())
 
-for inst in inst_candidates:
-    c = get_candles(inst)
-    t = get_ticker(inst)
+def get_candles(inst, limit=96):
+    # Incremental: hanya bar baru yang diambil, window dibaca dari disk
+    return market_cache.get(
+        ("candles", inst, limit),
+        lambda: sync_candles(okx, candle_store, inst, "15m", limit),
+        ttl=60, deadline=deadline
+    )
 
-    if not c or not t:
-        continue  # instrumen tidak valid / tidak ada data harga
+def _ticker(inst):
+    data = okx.get_data("/api/v5/market/ticker", {"instId": inst})
+    return data[0] if data else None
 
-    # OI boleh kosong (bukan error)
-    oi = get_oi_history(inst)
+def get_ticker(inst):
+    return market_cache.get(("ticker", inst), lambda: _ticker(inst), ttl=60, deadline=deadline)
+
+def get_oi_history(inst, limit=6, period="15m"):
+    return market_cache.get(
+        ("oi", inst, limit, period),
+        lambda: okx.get_data(
+            "/api/v5/public/open-interest-history",
+            {"instId": inst, "period": period, "limit": limit}
+        ),
+        ttl=300, deadline=deadline
+    )
 
-    candles = c
-    ticker = t
-    oi_hist = oi if oi else []
-    inst_used = inst
-    break
+def get_timeframe_candles(inst):
+    # 15m sudah di-sync get_candles; timeframe lain resample / sync incremental
+    return market_cache.get(
+        ("timeframes", inst),
+        lambda: timeframe_candles(okx, candle_store, inst),
+        ttl=60, deadline=deadline
+    )
 
-if candles is None:
-    st.error("❌ Data market tidak tersedia untuk pair ini.")
-    st.stop()
+def show_data_freshness():
+    """Keterangan jika sebagian data basi / gagal / tidak tiba sebelum deadline."""
+    if deadline.failed:
+        kinds = sorted({kind for kind, _ in deadline.failed})
+        st.caption(f"⚠️ Gagal diambil dari OKX: {', '.join(kinds)} (data terakhir dipakai jika ada)")
+    if deadline.late:
+        kinds = sorted({kind for kind, _ in deadline.late})
+        st.caption(
+            f"⏳ Belum tiba dalam {EVAL_DEADLINE_S:g} detik: {', '.join(kinds)} "
+            "(masih diambil di background, muat ulang sebentar lagi)"
+        )
+    elif deadline.stale:
+        st.caption("🕒 Sebagian data dari cache sebelumnya; refresh berjalan di background.")
+
+def show_api_stats():
+    with st.expander("📡 Statistik API OKX", expanded=False):
+        stats = okx.stats()
+        if not stats:
+            st.caption("Belum ada request ke OKX di proses ini.")
+            return
+        st.dataframe(
+            pd.DataFrame.from_dict(stats, orient="index")[
+                ["calls", "errors", "retries", "latency_avg_ms", "latency_max_ms"]
+            ].round(1),
+            use_container_width=True
+        )
 
-st.caption(f"Instrumen OKX yang digunakan: `{inst_used}`")
+# ==================================================
+# PERFORMANCE PANEL (OPSIONAL)
+# ==================================================
+set_enabled(st.sidebar.toggle(
+    "⏱ Performance",
+    value=is_enabled(),
+    help="Catat durasi tiap tahap (fetch, parse, label, jurnal). "
+         "Ekspor ke metrics.jsonl & metrics.prom."
+))
+
+def show_perf_panel():
+    if not is_enabled():
+        return
+    # Span proses ini dibuang ke disk setiap rerun
+    flush_jsonl()
+    write_prometheus()
+
+    with st.expander("⏱ Performance", expanded=True):
+        stats = summary()
+        if not stats:
+            st.caption("Belum ada span tercatat.")
+            return
+        st.dataframe(
+            pd.DataFrame(stats).round(2),
+            use_container_width=True,
+            hide_index=True
+        )
+        st.caption("Span terbaru")
+        st.dataframe(
+            pd.DataFrame(recent()[-50:][::-1]),
+            use_container_width=True,
+            hide_index=True
+        )
 
 # ==================================================
-# BUILD CANDLE DATAFRAME
+# STREAMING BACKEND (OPSIONAL)
 # ==================================================
-df = pd.DataFrame(
-    candles,
-    columns=["ts","o","h","l","c","vol","volCcy","volQuote","confirm"]
+use_stream = st.sidebar.toggle(
+    "⚡ Streaming (WebSocket)",
+    help="Candle, ticker & OI dari WebSocket OKX. REST hanya untuk seed awal."
 )
-df[["h","l","c","volQuote"]] = df[["h","l","c","volQuote"]].astype(float)
-df["range"] = df["h"] - df["l"]
 
-# ==================================================
-# RELATIVE VOLATILITY
-# ==================================================
-median_range = np.median(df["range"])
-avg_range = df["range"].mean()
-rvol_ratio = avg_range / median_range if median_range else 1.0
+def overlay_stream(inst, candles, ticker, oi_hist):
+    """Ganti data REST dengan state stream jika sudah tersedia."""
+    stream = get_stream()
+    stream.watch([inst])
 
-if rvol_ratio > 1.2:
-    rvol_label = "EXPANDING"
-elif rvol_ratio < 0.8:
-    rvol_label = "COMPRESSED"
-else:
-    rvol_label = "RANGE_NORMAL"
+    if len(stream.candles(inst)) < len(candles):
+        stream.seed_candles(inst, candles)
+    if len(stream.oi_history(inst)) < len(oi_hist):
+        stream.seed_oi(inst, oi_hist)
+
+    return (
+        stream.candles(inst, len(candles)) or candles,
+        stream.ticker(inst) or ticker,
+        stream.oi_history(inst) or oi_hist
+    )
+
+if use_stream:
+    st_autorefresh(interval=STREAM_REFRESH_MS, key="stream_timer")
+
+# ==================================================
+# CONTEXT ENGINE (RV • RVOL • OI • BEHAVIOR • VERDICT)
+# ==================================================
+def oi_late(inst, oi_hist):
+    """OI kosong karena tidak tiba sebelum deadline (bukan memang kosong)."""
+    return not oi_hist and ("oi", inst) in deadline.late
+
+def compute_context(candles, ticker, oi_hist):
+    """
+    Hitung seluruh label context untuk satu instrumen.
+    Memakai engine vektor yang sama dengan scanner (batch N = 1).
+    """
+    return evaluate_one(candles, ticker, oi_hist)
+
+def context_key(inst, candles, ticker, oi_hist):
+    """
+    Kunci memo context: instrumen + candle terbaru (ts & nilai bar berjalan)
+    + ts ticker + OI terbaru. Berubah hanya saat data pasar berubah.
+    """
+    return (
+        inst,
+        tuple(candles[0]) if candles else None,
+        ticker.get("ts") if ticker else None,
+        oi_hist[0]["ts"] if oi_hist else None
+    )
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def memo_context(key, _candles, _ticker, _oi_hist):
+    # Argumen ber-underscore tidak di-hash; identitas data ada di `key`
+    return compute_context(_candles, _ticker, _oi_hist)
 
 # ==================================================
-# RELATIVE VOLUME
+# TIME CONTEXT
 # ==================================================
-vol_24h = float(ticker["volCcy24h"])
-median_vol = np.median(df["volQuote"]) * len(df)
-rv_ratio = vol_24h / median_vol if median_vol else 1.0
+now_wib = wib_now()
+session = trading_session(now_wib.hour)
 
-if rv_ratio > 1.3:
-    rv_label = "ABOVE_USUAL"
-elif rv_ratio < 0.8:
-    rv_label = "BELOW_USUAL"
-else:
-    rv_label = "NORMAL"
+# ==================================================
+# MODE
+# ==================================================
+mode = st.radio(
+    "🎛️ Mode",
+    ["🔎 Satu Pair", "📋 Scanner Watchlist"],
+    horizontal=True
+)
 
 # ==================================================
-# OPEN INTEREST MOMENTUM (SAFE)
+# SCANNER MODE (MULTI PAIR • CONCURRENT)
 # ==================================================
-if oi_hist:
-    oi_df = pd.DataFrame(oi_hist)
-    oi_df["oi"] = oi_df["oi"].astype(float)
-    oi_delta = oi_df["oi"].iloc[0] - oi_df["oi"].iloc[-1]
+def scan_watchlist(bases):
+    """Fetch paralel seluruh watchlist, lalu hitung context dalam satu pass."""
+    markets = fetch_markets(
+        bases, get_candles, get_ticker, get_oi_history, index=instruments
+    )
 
-    if oi_delta > 0:
-        oi_label = "OI_BUILDING"
-    elif oi_delta < 0:
-        oi_label = "OI_UNWINDING"
+    found = [b for b in bases if b in markets]
+    if use_stream:
+        for base in found:
+            inst, c, t, oi = markets[base]
+            markets[base] = (inst, *overlay_stream(inst, c, t, oi))
+
+        # Statistik rolling dari stream, tanpa hitung ulang window
+        contexts = evaluate_stats(
+            [get_stream().candle_stats(markets[b][0]) for b in found],
+            [markets[b][2] for b in found],
+            [markets[b][3] for b in found]
+        )
     else:
-        oi_label = "OI_INERT"
-else:
-    oi_label = "OI_INERT"
+        # Semua pair dihitung dalam satu pass vektor
+        contexts = evaluate_batch(
+            [markets[b][1] for b in found],
+            [markets[b][2] for b in found],
+            [markets[b][3] for b in found]
+        )
+    ctx_by_base = {
+        b: mark_oi_unknown(c) if oi_late(markets[b][0], markets[b][3]) else c
+        for b, c in zip(found, contexts)
+    }
+
+    late_insts = {inst for _, inst in deadline.late}
+    rows = []
+    for base in bases:
+        if base not in markets:
+            late = late_insts & set(inst_candidates(base, instruments))
+            verdict = "⏳ Data belum tiba" if late else "❌ Data tidak tersedia"
+            rows.append({"pair": base, "inst_id": None, "verdict": verdict})
+            continue
+        rows.append({"pair": base, "inst_id": markets[base][0], **ctx_by_base[base]})
+
+    return rows
+
+if mode == "📋 Scanner Watchlist":
+    watchlist_raw = st.text_area(
+        "Watchlist (pisahkan dengan koma / spasi / baris baru)",
+        value=DEFAULT_WATCHLIST
+    )
 
-# ==================================================
-# TIME CONTEXT
-# ==================================================
-wib = pytz.timezone("Asia/Jakarta")
-now_wib = datetime.now(wib)
-hour = now_wib.hour
+    bases = []
+    for b in re.split(r"[\s,]+", watchlist_raw.upper()):
+        if b and re.match(r"^[A-Z]{2,10}$", b) and b not in bases:
+            bases.append(b)
+
+    if not bases:
+        st.error("Watchlist kosong / format tidak valid.")
+        st.stop()
+
+    st.caption(f"{len(bases)} pair • Session: {session} • WIB {now_wib.strftime('%H:%M')}")
+
+    unknown = [b for b in bases if instruments and not instruments.candidates(b)]
+    if unknown:
+        st.warning(f"Tidak ada kontrak SWAP OKX: {', '.join(unknown)} (dilewati tanpa request)")
+
+    if st.button("🚀 Scan Sekarang", use_container_width=True):
+        with span("scan.total", pairs=len(bases)):
+            scan_rows = scan_watchlist(bases)
+        scan_df = pd.DataFrame(scan_rows).reindex(columns=SCAN_COLUMNS)
+        scan_df["rank"] = scan_df["verdict"].map(VERDICT_RANK).fillna(len(VERDICT_RANK))
+        scan_df = scan_df.sort_values(
+            ["rank", "rv_ratio"],
+            ascending=[True, False],
+            na_position="last"
+        ).drop(columns="rank")
+
+        for col in ["rv_label", "rvol_label", "oi_label", "behavior"]:
+            scan_df[col] = scan_df[col].map(lambda v: LABEL_ID.get(v, v) if isinstance(v, str) else v)
+
+        st.dataframe(
+            scan_df.reindex(columns=SCAN_COLUMNS),
+            use_container_width=True,
+            hide_index=True
+        )
+        show_data_freshness()
 
-if 7 <= hour < 14:
-    session = "Asia"
-elif 14 <= hour < 19:
-    session = "London"
-elif 19 <= hour < 23:
-    session = "New York"
-else:
-    session = "Off-hours"
+    show_api_stats()
+    show_perf_panel()
+    st.stop()
 
 # ==================================================
-# MARKET BEHAVIOR
+# PAIR INPUT (SIMPEL & CEPAT)
 # ==================================================
-if rv_label == "ABOVE_USUAL" and rvol_label == "COMPRESSED" and oi_label == "OI_BUILDING":
-    behavior = "ACCUMULATION_LIKE"
-elif rv_label == "ABOVE_USUAL" and rvol_label == "EXPANDING" and oi_label == "OI_BUILDING":
-    behavior = "HEALTHY_PARTICIPATION"
-elif oi_label == "OI_UNWINDING":
-    behavior = "EXIT_LIKE"
-elif rv_label == "BELOW_USUAL":
-    behavior = "LOW_ENGAGEMENT"
+PAIR_LABEL = "Pair Futures (cukup simbol dasar, contoh: BTC, ETH, SOL)"
+
+if instruments:
+    # Autocomplete dari index instrumen; simbol lain tetap bisa diketik
+    base_options = instruments.bases()
+    base_asset = (st.selectbox(
+        PAIR_LABEL,
+        base_options,
+        index=base_options.index("BTC") if "BTC" in base_options else 0,
+        accept_new_options=True
+    ) or "").upper().strip()
+else:
+    base_asset = st.text_input(PAIR_LABEL, value="BTC").upper().strip()
+
+if not re.match(r"^[A-Z]{2,10}$", base_asset):
+    st.error("Format pair tidak valid.")
+    st.stop()
+
+if instruments and not instruments.candidates(base_asset):
+    st.error("❌ Tidak ada kontrak SWAP OKX aktif untuk pair ini.")
+    st.stop()
+
+# Candle, ticker & OI diambil paralel; total tunggu dibatasi deadline
+market = fetch_markets(
+    [base_asset], get_candles, get_ticker, get_oi_history, index=instruments
+).get(base_asset)
+
+if market is None:
+    if deadline.late:
+        st.warning(f"⏳ OKX lambat: data belum tiba dalam {EVAL_DEADLINE_S:g} detik. Muat ulang sebentar lagi.")
+    else:
+        st.error("❌ Data market tidak tersedia untuk pair ini.")
+    st.stop()
+
+inst_used, candles, ticker, oi_hist = market
+
+if use_stream:
+    candles, ticker, oi_hist = overlay_stream(inst_used, candles, ticker, oi_hist)
+
+inst_meta = instruments.meta(inst_used)
+if inst_meta:
+    st.caption(
+        f"Instrumen OKX yang digunakan: `{inst_used}` • "
+        f"tickSz {inst_meta['tickSz']} • ctVal {inst_meta['ctVal']} {inst_meta['ctValCcy']}"
+    )
 else:
-    behavior = "MIXED"
+    st.caption(f"Instrumen OKX yang digunakan: `{inst_used}`")
 
 # ==================================================
-# VERDICT
+# MARKET CONTEXT
 # ==================================================
-if behavior in ["LOW_ENGAGEMENT", "EXIT_LIKE"]:
-    verdict = "⛔ Tidak Layak Ditrade"
-elif behavior == "ACCUMULATION_LIKE":
-    verdict = "⚠️ Amati Saja"
-else:
-    verdict = "✅ Layak Dipantau"
+with span("context.evaluate", source="stream" if use_stream else "rest"):
+    if use_stream:
+        ctx = evaluate_stats([get_stream().candle_stats(inst_used)], [ticker], [oi_hist])[0]
+    else:
+        # Rerun karena widget (catatan, radio) → ambil dari memo
+        ctx = memo_context(context_key(inst_used, candles, ticker, oi_hist), candles, ticker, oi_hist)
+    if oi_late(inst_used, oi_hist):
+        ctx = mark_oi_unknown(ctx)
+rv_label = ctx["rv_label"]
+rvol_label = ctx["rvol_label"]
+oi_label = ctx["oi_label"]
+behavior = ctx["behavior"]
+verdict = ctx["verdict"]
 
 # ==================================================
 # DISPLAY
@@ -271,43 +467,135 @@ st.subheader("🎯 Sikap yang Disarankan")
 st.markdown(f"### {verdict}")
 
 # ==================================================
-# JOURNAL INPUT
-# ==================================================
-st.divider()
-st.subheader("📝 Jurnal Keputusan")
-
-decision = st.radio("Keputusan", ["SKIPPED", "TAKEN"], horizontal=True)
-note = st.text_input("Catatan (opsional)")
-
-if st.button("💾 Simpan ke Jurnal"):
-    dfj = pd.read_csv(JOURNAL_FILE)
-    dfj.loc[len(dfj)] = [
-        now_wib.strftime("%Y-%m-%d %H:%M"),
-        base_asset,
-        inst_used,
-        session,
-        rv_label,
-        rvol_label,
-        oi_label,
-        behavior,
-        verdict,
-        decision,
-        note
-    ]
-    dfj.to_csv(JOURNAL_FILE, index=False)
-    st.success("Jurnal tersimpan.")
+# MULTI-TIMEFRAME (5m • 15m • 1H • 4H)
+# ==================================================
+def timeframe_oi(inst):
+    """
+    OI 15m / 1H / 4H dari satu histori 15m; 5m fetch sendiri.
+    None = tidak tiba sebelum deadline / gagal.
+    """
+    base = get_oi_history(inst, OI_BASE_LIMIT) or []
+    out = {}
+    for bar in MTF_BARS:
+        oi = derive_oi(base, bar)
+        if oi is None:
+            oi = get_oi_history(inst, OI_PERIODS, bar)
+        out[bar] = oi
+    return out
+
+def show_timeframes():
+    with span("mtf.total"):
+        tf_candles = get_timeframe_candles(inst_used)
+        if tf_candles is None:
+            if ("timeframes", inst_used) in deadline.failed:
+                st.caption("⚠️ Candle multi-timeframe gagal diambil dari OKX.")
+            else:
+                st.caption(f"⏳ Candle multi-timeframe belum tiba dalam {EVAL_DEADLINE_S:g} detik.")
+            return
+        tf_oi = timeframe_oi(inst_used)
+        tf_ctx = evaluate_timeframes(
+            {bar: rows for bar, (rows, _) in tf_candles.items()},
+            ticker,
+            {bar: oi or [] for bar, oi in tf_oi.items()}
+        )
+        tf_ctx = {
+            bar: mark_oi_unknown(c) if tf_oi[bar] is None else c
+            for bar, c in tf_ctx.items()
+        }
+
+    st.dataframe(
+        pd.DataFrame([
+            {
+                "TF": bar,
+                "Volume": LABEL_ID[c["rv_label"]],
+                "Volatilitas": LABEL_ID[c["rvol_label"]],
+                "Open Interest": LABEL_ID[c["oi_label"]],
+                "Perilaku": LABEL_ID[c["behavior"]],
+                "Sikap": c["verdict"],
+                "Candle": tf_candles[bar][1]
+            }
+            for bar, c in tf_ctx.items()
+        ]),
+        use_container_width=True,
+        hide_index=True
+    )
 
-# ==================================================
-# EXPORT
-# ==================================================
-st.divider()
-with open(JOURNAL_FILE, "rb") as f:
-    st.download_button(
+if st.toggle("🧮 Multi-timeframe (5m • 15m • 1H • 4H)"):
+    show_timeframes()
+
+show_data_freshness()
+
+# ==================================================
+# JOURNAL INPUT (FRAGMENT)
+# ==================================================
+@st.cache_data(max_entries=2, show_spinner=False)
+def journal_csv(version):
+    # Dibangun ulang hanya jika jurnal berubah
+    return journal.export_csv()
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def journal_parquet(version, _rows):
+    # Bertipe (datetime_wib = timestamp) + zstd; dibaca tanpa parse teks.
+    # _rows = view bersama service (tidak di-hash; version yang jadi key)
+    return parquet_bytes(journal_table(_rows, CONTEXT_JOURNAL))
+
+@st.fragment
+def journal_form():
+    """
+    Isi catatan / pilih keputusan hanya me-rerun fragment ini,
+    bukan fetch + context di atasnya.
+    """
+    st.divider()
+    st.subheader("📝 Jurnal Keputusan")
+
+    decision = st.radio("Keputusan", ["SKIPPED", "TAKEN"], horizontal=True)
+    note = st.text_input("Catatan (opsional)")
+
+    if st.button("💾 Simpan ke Jurnal"):
+        # Waktu & session saat simpan (fragment tidak me-rerun bagian atas
+        # script); antre ke writer bersama, kembali setelah batch-nya commit
+        saved = wib_now()
+        saved_at = saved.strftime(WIB_FORMAT)
+        journal.append(dict(zip(EXPECTED_COLUMNS, [
+            saved_at,
+            base_asset,
+            inst_used,
+            trading_session(saved.hour),
+            rv_label,
+            rvol_label,
+            oi_label,
+            behavior,
+            verdict,
+            decision,
+            note
+        ])))
+        # TAKEN langsung terlihat di Risk Manager (tanpa baca ulang jurnal)
+        publish_decision(base_asset, inst_used, decision, saved_at)
+        st.success("Jurnal tersimpan.")
+
+    # ---------- EXPORT ----------
+    st.divider()
+    version = journal.backend.version()
+    c1, c2 = st.columns(2)
+    c1.download_button(
         "📤 Download context_gate_journal.csv",
-        f,
+        journal_csv(version),
         file_name="context_gate_journal.csv",
         mime="text/csv"
     )
+    # Dibangun hanya saat tombol diklik (thread terpisah), bukan tiap simpan
+    view_version, view = journal.snapshot()
+    c2.download_button(
+        "📦 Download .parquet",
+        lambda: journal_parquet(view_version, view),
+        file_name="context_gate_journal.parquet",
+        mime="application/vnd.apache.parquet"
+    )
+
+journal_form()
+
+show_api_stats()
+show_perf_panel()
 
 # ==================================================
 # GLOSSARY (LENGKAP & JELAS)
@@ -0,0 +1,26 @@
+"""
+Logika inti Context Gate & Risk Manager (tanpa Streamlit).
+
+Submodul baru di-import saat dipakai, jadi `import mbokmenowo` murah
+dan dependency berat (numpy, pandas, requests) tidak ikut termuat:
+
+    from mbokmenowo.context_engine import evaluate_batch
+    from mbokmenowo.risk import size_position
+"""
+import importlib
+
+SUBMODULES = (
+    "candle_store", "columnar", "context_engine", "decision_feed",
+    "gate_daemon", "instruments", "journal_backup", "journal_service",
+    "journal_store", "market", "market_cache", "okx_client", "okx_stream",
+    "perf_metrics", "replay_engine", "risk", "rolling_stats", "timeframes",
+    "trade_analytics", "wib"
+)
+
+def __getattr__(name):
+    if name in SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted([*globals(), *SUBMODULES])
@@ -0,0 +1,249 @@
+import sqlite3
+import threading
+import time
+
+from .perf_metrics import span
+
+# ==================================================
+# CONFIG
+# ==================================================
+CANDLE_DB_FILE = "candles.db"
+
+BAR_MS = {
+    "1m": 60_000,
+    "5m": 5 * 60_000,
+    "15m": 15 * 60_000,
+    "1H": 60 * 60_000,
+    "4H": 4 * 60 * 60_000,
+}
+
+# Kolom candle OKX (urutan sama dengan payload /market/candles)
+CANDLE_COLUMNS = ["ts", "o", "h", "l", "c", "vol", "volCcy", "volQuote", "confirm"]
+
+MAX_FETCH_LIMIT = 300  # batas limit /market/candles
+RECENT_MAX_BARS = 1440  # /market/candles hanya menyajikan 1440 candle terakhir
+
+# ==================================================
+# SQLITE CANDLE STORE
+# ==================================================
+class CandleStore:
+    """
+    Penyimpanan candle lokal (SQLite, WAL), key (inst_id, bar, ts).
+    Nilai disimpan sebagai string persis seperti payload OKX,
+    jadi window yang dibaca identik dengan hasil API.
+    """
+
+    def __init__(self, path=CANDLE_DB_FILE):
+        self.path = path
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS candles (
+                inst_id TEXT NOT NULL,
+                bar TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                o TEXT, h TEXT, l TEXT, c TEXT,
+                vol TEXT, volCcy TEXT, volQuote TEXT,
+                confirm TEXT,
+                PRIMARY KEY (inst_id, bar, ts)
+            ) WITHOUT ROWID
+        """)
+        conn.commit()
+
+    def _conn(self):
+        # Satu koneksi per thread (scanner memakai thread pool)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def latest_confirmed_ts(self, inst, bar):
+        row = self._conn().execute(
+            "SELECT MAX(ts) FROM candles WHERE inst_id=? AND bar=? AND confirm='1'",
+            (inst, bar)
+        ).fetchone()
+        return row[0]
+
+    def count(self, inst, bar):
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM candles WHERE inst_id=? AND bar=?",
+            (inst, bar)
+        ).fetchone()[0]
+
+    def upsert(self, inst, bar, rows):
+        """Merge candle OKX; candle yang belum confirm akan tertimpa versi terbaru."""
+        if not rows:
+            return
+        conn = self._conn()
+        conn.executemany(
+            "INSERT OR REPLACE INTO candles VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+            [(inst, bar, int(r[0]), *r[1:9]) for r in rows]
+        )
+        conn.commit()
+
+    def window(self, inst, bar, limit):
+        """Candle terbaru dulu (sama seperti urutan API)."""
+        rows = self._conn().execute(
+            "SELECT ts, o, h, l, c, vol, volCcy, volQuote, confirm FROM candles "
+            "WHERE inst_id=? AND bar=? ORDER BY ts DESC LIMIT ?",
+            (inst, bar, limit)
+        ).fetchall()
+        return [[str(r[0]), *r[1:]] for r in rows]
+
+    def since(self, since_ms=0, chunk=100_000):
+        """Semua candle ts >= since_ms (inst_id, bar, ts, ...) per chunk, untuk ekspor."""
+        cur = self._conn().execute(
+            "SELECT * FROM candles WHERE ts >= ? ORDER BY inst_id, bar, ts", (since_ms,)
+        )
+        while True:
+            rows = cur.fetchmany(chunk)
+            if not rows:
+                return
+            yield rows
+
+# ==================================================
+# INCREMENTAL SYNC
+# ==================================================
+def sync_candles(client, store, inst, bar="15m", limit=96):
+    """
+    Ambil hanya candle setelah candle confirm terakhir,
+    merge ke store, lalu sajikan window `limit` bar dari disk.
+    Fallback ke fetch penuh jika store kosong / ada gap.
+    """
+    with span("candles.sync", bar=bar):
+        return _sync(client, store, inst, bar, limit)
+
+def _sync(client, store, inst, bar, limit):
+    path = "/api/v5/market/candles"
+    last_ts = store.latest_confirmed_ts(inst, bar)
+
+    full_fetch = last_ts is None or store.count(inst, bar) < limit
+
+    if not full_fetch:
+        now_ms = int(time.time() * 1000)
+        missing = (now_ms - last_ts) // BAR_MS[bar] + 1  # + candle berjalan
+        if missing > MAX_FETCH_LIMIT:
+            full_fetch = True
+
+    if full_fetch:
+        rows = client.get_data(path, {"instId": inst, "bar": bar, "limit": limit})
+        store.upsert(inst, bar, rows)
+        return store.window(inst, bar, limit) if rows else []
+
+    rows = client.get_data(path, {"instId": inst, "bar": bar, "limit": int(missing) + 1})
+
+    # Fetch gagal (selalu ada minimal candle berjalan): window disk hanya
+    # dipakai jika candle terbarunya masih berjalan; lebih tua → [] seperti
+    # fetch penuh yang gagal, bukan bar lama yang tampak terkini
+    if not rows:
+        window = store.window(inst, bar, limit)
+        if not window or now_ms - int(window[0][0]) >= BAR_MS[bar]:
+            return []
+        return window
+
+    # Candle tertua hasil fetch harus menyambung ke candle confirm terakhir
+    if int(rows[-1][0]) > last_ts + BAR_MS[bar]:
+        rows = client.get_data(path, {"instId": inst, "bar": bar, "limit": limit})
+        if not rows:
+            return []  # window disk ber-gap
+
+    store.upsert(inst, bar, rows)
+    return store.window(inst, bar, limit)
+
+def _contiguous(rows, bar_ms):
+    """Jumlah candle terbaru (terbaru dulu) yang bersambung tanpa gap."""
+    n = 1 if rows else 0
+    while n < len(rows) and int(rows[n - 1][0]) - int(rows[n][0]) == bar_ms:
+        n += 1
+    return n
+
+def backfill_candles(client, store, inst, bar, bars):
+    """
+    Lengkapi histori `bar` di store sampai `bars` candle terbaru yang
+    bersambung (halaman ke belakang dengan `after`). Praktis sekali per
+    instrumen: sync berikutnya incremental. Return True jika histori cukup.
+    """
+    if bars > RECENT_MAX_BARS:
+        return False
+
+    with span("candles.backfill", bar=bar) as s:
+        pages = 0
+        while pages <= bars // MAX_FETCH_LIMIT:
+            rows = store.window(inst, bar, bars)
+            n = _contiguous(rows, BAR_MS[bar])
+            if n == 0 or n >= bars:
+                break
+            page = client.get_data(
+                "/api/v5/market/candles",
+                {"instId": inst, "bar": bar, "after": rows[n - 1][0],
+                 "limit": min(MAX_FETCH_LIMIT, bars - n)}
+            )
+            pages += 1
+            if not page:
+                break
+            store.upsert(inst, bar, page)
+        else:
+            n = _contiguous(store.window(inst, bar, bars), BAR_MS[bar])
+        s.label(pages=pages)
+        return n >= bars
+
+# ==================================================
+# RESAMPLE (TIMEFRAME LEBIH BESAR DARI BAR TERSIMPAN)
+# ==================================================
+def resample_candles(rows, src_bar, dst_bar, limit):
+    """
+    Gabungkan candle src_bar (terbaru dulu, format payload OKX) menjadi
+    `limit` candle dst_bar. Bucket dihitung dari epoch (sama dengan OKX
+    untuk 1H / 4H). Return None jika bar sumber kurang atau ada gap.
+    """
+    src_ms, dst_ms = BAR_MS[src_bar], BAR_MS[dst_bar]
+    ratio = dst_ms // src_ms
+
+    groups = []  # [(start, [rows terbaru dulu])], terbaru dulu
+    prev_ts = None
+    for r in rows:
+        ts = int(r[0])
+        if prev_ts is not None and prev_ts - ts != src_ms:
+            break  # gap → bucket berikutnya tidak lengkap
+        prev_ts = ts
+        start = ts - ts % dst_ms
+        if not groups or groups[-1][0] != start:
+            groups.append((start, []))
+        groups[-1][1].append(r)
+
+    out = []
+    for i, (start, g) in enumerate(groups[:limit]):
+        complete = len(g) == ratio
+        if i > 0 and not complete:
+            break  # hanya bucket terbaru yang boleh belum lengkap
+        out.append([
+            str(start),
+            g[-1][1],
+            str(max(float(r[2]) for r in g)),
+            str(min(float(r[3]) for r in g)),
+            g[0][4],
+            str(sum(float(r[5]) for r in g)),
+            str(sum(float(r[6]) for r in g)),
+            str(sum(float(r[7]) for r in g)),
+            "1" if complete and g[0][8] == "1" else "0"
+        ])
+
+    return out if len(out) == limit else None
+
+# ==================================================
+# SHARED INSTANCE
+# ==================================================
+_store = None
+_store_lock = threading.Lock()
+
+def get_store():
+    """Store bersama satu proses."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CandleStore()
+        return _store
@@ -0,0 +1,249 @@
+"""
+Ekspor jurnal & histori candle ke Parquet (Arrow), plus loader analitik.
+
+    python -m mbokmenowo.columnar export             # semua jurnal + candle
+    python -m mbokmenowo.columnar export --days 7    # partisi 7 hari terakhir
+
+Dataset (hive, zstd, bertipe; kolom waktu = timestamp):
+    exports/{table}/date=YYYY-MM/pair={pair}/part-0.parquet
+    exports/candles/date=YYYY-MM/inst_id={inst}/part-0.parquet
+
+Partisi tanggal per bulan (DATE_PARTITION): partisi harian menghasilkan
+ribuan file kecil yang justru lebih lambat dibaca daripada CSV.
+Partisi yang disentuh ditulis ulang utuh; partisi lain tidak berubah.
+load() memory-map file, membaca hanya kolom yang diminta, dan filter
+tanggal / pair memangkas partisi sebelum file dibuka.
+"""
+import argparse
+import io
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+from .candle_store import CANDLE_COLUMNS
+from .journal_store import CONTEXT_JOURNAL, CONTEXT_LABELS, TRADE_JOURNAL
+
+# ==================================================
+# CONFIG
+# ==================================================
+EXPORT_DIR = "exports"
+COMPRESSION = "zstd"
+DATE_PARTITION = "%Y-%m"   # granularitas partisi date (string terurut)
+JOURNAL_SPECS = (CONTEXT_JOURNAL, CONTEXT_LABELS, TRADE_JOURNAL)
+
+ARROW_TYPES = {
+    "TEXT": pa.string(),
+    "REAL": pa.float64(),
+    "INTEGER": pa.int64()
+}
+
+CANDLE_SCHEMA = pa.schema([
+    ("inst_id", pa.string()),
+    ("bar", pa.string()),
+    ("ts", pa.timestamp("ms")),
+    *((c, pa.float64()) for c in CANDLE_COLUMNS[1:-1]),
+    ("confirm", pa.bool_())
+])
+
+# Dataset → (kolom waktu, kolom partisi pair)
+DATASETS = {
+    **{spec["table"]: (spec["time_column"], "pair") for spec in JOURNAL_SPECS},
+    "candles": ("ts", "inst_id")
+}
+
+# ==================================================
+# ARROW TABLES (BERTIPE)
+# ==================================================
+def journal_schema(spec):
+    time_col = spec["time_column"]
+    return pa.schema([
+        ("id", pa.int64()),
+        *(
+            (c, pa.timestamp("ms") if c == time_col else ARROW_TYPES[t])
+            for c, t in spec["columns"].items()
+        )
+    ])
+
+def _text(value):
+    return None if pd.isna(value) else str(value)
+
+def journal_table(rows, spec):
+    """
+    Baris jurnal (dict) → Arrow Table; waktu teks (WIB / UTC naive) → timestamp.
+    Tipe mengikuti spec, bukan inferensi pandas: backend CSV bisa membaca
+    note yang semuanya angka sebagai int64.
+    """
+    df = pd.DataFrame(list(rows), columns=["id", *spec["columns"]])
+    time_col = spec["time_column"]
+    for c, t in spec["columns"].items():
+        if c == time_col:
+            # Presisi ms (trade: isoformat() bermikrodetik → cast ke ms gagal)
+            df[c] = pd.to_datetime(df[c], format="ISO8601", errors="coerce").dt.floor("ms")
+        elif t == "TEXT":
+            df[c] = df[c].map(_text).astype(object)
+        elif t == "INTEGER":
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype("Int64")
+        else:
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype("float64")
+    return pa.Table.from_pandas(df, schema=journal_schema(spec), preserve_index=False)
+
+def candle_batches(chunks):
+    """Chunk baris CandleStore (string payload OKX) → RecordBatch bertipe."""
+    for rows in chunks:
+        cols = list(zip(*rows))
+        yield pa.record_batch(
+            [
+                pa.array(cols[0], pa.string()),
+                pa.array(cols[1], pa.string()),
+                pa.array(cols[2], pa.int64()).cast(pa.timestamp("ms")),
+                *(pa.array(c, pa.string()).cast(pa.float64()) for c in cols[3:10]),
+                pc.equal(pa.array(cols[10], pa.string()), "1")
+            ],
+            schema=CANDLE_SCHEMA
+        )
+
+def parquet_bytes(table):
+    """Satu file Parquet (untuk tombol download)."""
+    buf = io.BytesIO()
+    pq.write_table(table, buf, compression=COMPRESSION)
+    return buf.getvalue()
+
+# ==================================================
+# PARTITIONED DATASET (DATE × PAIR)
+# ==================================================
+def _partitioning(pair_col):
+    return ds.partitioning(
+        pa.schema([("date", pa.string()), (pair_col, pa.string())]),
+        flavor="hive"
+    )
+
+def _with_date(batch, time_col):
+    # Tanggal dari kolom waktu (tanpa konversi zona: WIB tetap WIB)
+    date = pc.strftime(batch.column(time_col), format=DATE_PARTITION)
+    return batch.append_column("date", date)
+
+def write_dataset(data, name, root=EXPORT_DIR):
+    """
+    Tulis Table / iterable RecordBatch ke {root}/{name}, partisi date × pair.
+    Partisi yang ada di data ditimpa; sisanya dibiarkan.
+    """
+    time_col, pair_col = DATASETS[name]
+    if isinstance(data, pa.Table):
+        schema = data.schema
+        batches = data.to_batches()
+    else:
+        schema = CANDLE_SCHEMA
+        batches = data
+
+    ds.write_dataset(
+        (_with_date(b, time_col) for b in batches),
+        os.path.join(root, name),
+        schema=schema.append(pa.field("date", pa.string())),
+        format="parquet",
+        partitioning=_partitioning(pair_col),
+        basename_template="part-{i}.parquet",
+        existing_data_behavior="delete_matching",
+        file_options=ds.ParquetFileFormat().make_write_options(compression=COMPRESSION)
+    )
+
+def partition_start(t):
+    """Awal partisi date yang memuat t (ekspor parsial tidak memotong partisi)."""
+    return datetime.strptime(t.strftime(DATE_PARTITION), DATE_PARTITION)
+
+def export_journal(journal, spec, since=None, root=EXPORT_DIR):
+    """Ekspor jurnal (backend apa pun); since (opsional) dibulatkan ke awal partisi."""
+    table = journal_table(journal.rows(), spec)
+    time_col = spec["time_column"]
+    if since is not None:
+        since = partition_start(since)
+        table = table.filter(pc.greater_equal(table[time_col], pa.scalar(since, pa.timestamp("ms"))))
+    table = table.filter(pc.is_valid(table[time_col])).sort_by(time_col)
+    write_dataset(table, spec["table"], root)
+    return table.num_rows
+
+def export_candles(store, since=None, root=EXPORT_DIR):
+    since_ms = 0
+    if since is not None:
+        since_ms = int((partition_start(since) - datetime(1970, 1, 1)).total_seconds() * 1000)
+    count = [0]
+
+    def counted(batches):
+        for b in batches:
+            count[0] += b.num_rows
+            yield b
+
+    write_dataset(counted(candle_batches(store.since(since_ms))), "candles", root)
+    return count[0]
+
+# ==================================================
+# LOADER (MEMORY-MAP • PROYEKSI • PUSHDOWN)
+# ==================================================
+def dataset(name, root=EXPORT_DIR):
+    _, pair_col = DATASETS[name]
+    return ds.dataset(
+        os.path.join(root, name),
+        format="parquet",
+        partitioning=_partitioning(pair_col),
+        filesystem=fs.LocalFileSystem(use_mmap=True)
+    )
+
+def load(name, columns=None, since=None, until=None, pairs=None, root=EXPORT_DIR, **equals):
+    """
+    Dataset → DataFrame.
+    columns: kolom yang dibaca (None = semua, tanpa kolom partisi date).
+    since / until (datetime): rentang waktu; pairs: list pair / inst_id;
+    equals: kolom == nilai (mis. decision="TAKEN"). Semua filter didorong
+    ke scan: partisi di luar rentang / pair tidak dibuka, row group
+    dilewati lewat statistik Parquet.
+    """
+    time_col, pair_col = DATASETS[name]
+    conds = []
+    if since is not None:
+        conds += [ds.field("date") >= since.strftime(DATE_PARTITION), ds.field(time_col) >= since]
+    if until is not None:
+        conds += [ds.field("date") <= until.strftime(DATE_PARTITION), ds.field(time_col) < until]
+    if pairs:
+        conds.append(ds.field(pair_col).isin(list(pairs)))
+    conds += [ds.field(k) == v for k, v in equals.items()]
+
+    expr = None
+    for c in conds:
+        expr = c if expr is None else expr & c
+
+    data = dataset(name, root)
+    if columns is None:
+        columns = [f for f in data.schema.names if f != "date"]
+    return data.to_table(columns=columns, filter=expr).to_pandas()
+
+# ==================================================
+# CLI
+# ==================================================
+if __name__ == "__main__":
+    from .candle_store import get_store
+    from .journal_store import open_journal
+
+    parser = argparse.ArgumentParser(description="Ekspor jurnal & candle ke Parquet terpartisi")
+    parser.add_argument("command", choices=["export"])
+    parser.add_argument("--days", type=int, help="hanya N hari terakhir (default: semua)")
+    parser.add_argument("--only", nargs="*", choices=list(DATASETS), help="dataset tertentu")
+    parser.add_argument("--out", default=EXPORT_DIR)
+    args = parser.parse_args()
+
+    since = None
+    if args.days:
+        since = datetime.utcnow() - timedelta(days=args.days)
+
+    for spec in JOURNAL_SPECS:
+        if not args.only or spec["table"] in args.only:
+            n = export_journal(open_journal(spec), spec, since, args.out)
+            print(f"{spec['table']:22} {n:>9} baris → {os.path.join(args.out, spec['table'])}")
+
+    if not args.only or "candles" in args.only:
+        n = export_candles(get_store(), since, args.out)
+        print(f"{'candles':22} {n:>9} baris → {os.path.join(args.out, 'candles')}")
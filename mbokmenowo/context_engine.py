@@ -0,0 +1,217 @@
+import numpy as np
+
+from .perf_metrics import timed
+
+# ==================================================
+# THRESHOLDS (SAMA DENGAN LOGIKA CONTEXT GATE)
+# ==================================================
+RVOL_EXPANDING = 1.2
+RVOL_COMPRESSED = 0.8
+RV_ABOVE = 1.3
+RV_BELOW = 0.8
+
+VERDICT_NO_TRADE = "⛔ Tidak Layak Ditrade"
+VERDICT_WATCH = "⚠️ Amati Saja"
+VERDICT_MONITOR = "✅ Layak Dipantau"
+
+# OI tidak tiba sebelum deadline (label dihitung seperti OI kosong)
+OI_UNKNOWN = "OI_UNKNOWN"
+
+# Index kolom payload candle OKX
+COL_H, COL_L, COL_VOLQUOTE = 2, 3, 7
+
+# ==================================================
+# PARSE RAW OKX PAYLOAD → FLOAT ARRAYS (TANPA DATAFRAME)
+# ==================================================
+@timed("parse.candles")
+def stack_candles(candle_payloads, bars=None):
+    """
+    List payload candle (per instrumen) → array (instrumen × bar).
+    Return (high, low, vol_quote); instrumen dengan bar lebih sedikit
+    di-pad NaN di sisi kanan (bar tertua).
+    """
+    n = len(candle_payloads)
+    if bars is None:
+        bars = max((len(c) for c in candle_payloads), default=0)
+
+    out = np.full((n, bars, 3), np.nan)
+    for i, rows in enumerate(candle_payloads):
+        rows = rows[:bars]
+        if rows:
+            # float() per nilai ~4x lebih cepat dari astype() array string
+            out[i, :len(rows)] = np.fromiter(
+                (float(r[k]) for r in rows for k in (COL_H, COL_L, COL_VOLQUOTE)),
+                dtype=np.float64,
+                count=3 * len(rows)
+            ).reshape(-1, 3)
+
+    return out[:, :, 0], out[:, :, 1], out[:, :, 2]
+
+def stack_tickers(tickers):
+    """volCcy24h per instrumen (NaN jika ticker kosong)."""
+    return np.array(
+        [float(t["volCcy24h"]) if t else np.nan for t in tickers],
+        dtype=np.float64
+    )
+
+def stack_oi(oi_payloads):
+    """(oi terbaru, oi tertua) per instrumen; NaN jika histori OI kosong."""
+    first = np.full(len(oi_payloads), np.nan)
+    last = np.full(len(oi_payloads), np.nan)
+    for i, hist in enumerate(oi_payloads):
+        if hist:
+            first[i] = float(hist[0]["oi"])
+            last[i] = float(hist[-1]["oi"])
+    return first, last
+
+# ==================================================
+# VECTORIZED LABELS (SATU PASS UNTUK SEMUA INSTRUMEN)
+# ==================================================
+def _safe_ratio(num, den):
+    # Sama seperti `num / den if den else 1.0`
+    return np.divide(num, den, out=np.ones_like(num), where=(den != 0) & ~np.isnan(den))
+
+def compute_labels(high, low, vol_quote, vol_24h, oi_first, oi_last, day_bars=None):
+    """
+    Hitung rv / rvol / OI / behavior / verdict untuk N instrumen sekaligus.
+    Input array (N × bar) untuk candle, (N,) untuk ticker & OI.
+    day_bars (N,): jumlah bar per 24 jam tiap baris (multi-timeframe);
+    None = window dianggap 24 jam (15m × 96).
+    """
+    rng = high - low
+    bar_count = np.count_nonzero(~np.isnan(rng), axis=1)
+    full = bool(bar_count.size) and bool((bar_count == rng.shape[1]).all())
+
+    # Volume 24 jam dibanding median bar × bar per hari.
+    # Window belum penuh (listing baru) → hanya bar yang ada.
+    day_count = bar_count
+    if day_bars is not None:
+        day_count = np.where(
+            bar_count == rng.shape[1], day_bars, np.minimum(bar_count, day_bars)
+        )
+
+    # np.median lebih cepat; nanmedian hanya jika ada padding
+    median = np.median if full else np.nanmedian
+    mean = np.mean if full else np.nanmean
+
+    return classify(
+        mean(rng, axis=1),
+        median(rng, axis=1),
+        median(vol_quote, axis=1),
+        day_count,
+        vol_24h,
+        oi_first,
+        oi_last
+    )
+
+@timed("labels.classify")
+def classify(avg_range, median_range, median_vol, bar_count, vol_24h, oi_first, oi_last):
+    """
+    Tahap label dari statistik window (semua array (N,)).
+    Dipakai compute_labels (batch) dan RollingCandleStats (streaming).
+    """
+    # ---------- RELATIVE VOLATILITY ----------
+    rvol_ratio = _safe_ratio(avg_range, median_range)
+    rvol_label = np.select(
+        [rvol_ratio > RVOL_EXPANDING, rvol_ratio < RVOL_COMPRESSED],
+        ["EXPANDING", "COMPRESSED"],
+        "RANGE_NORMAL"
+    )
+
+    # ---------- RELATIVE VOLUME ----------
+    rv_ratio = _safe_ratio(vol_24h, median_vol * bar_count)
+    rv_label = np.select(
+        [rv_ratio > RV_ABOVE, rv_ratio < RV_BELOW],
+        ["ABOVE_USUAL", "BELOW_USUAL"],
+        "NORMAL"
+    )
+
+    # ---------- OPEN INTEREST MOMENTUM ----------
+    oi_delta = np.nan_to_num(oi_first - oi_last)  # OI kosong → INERT
+    oi_label = np.select(
+        [oi_delta > 0, oi_delta < 0],
+        ["OI_BUILDING", "OI_UNWINDING"],
+        "OI_INERT"
+    )
+
+    # ---------- MARKET BEHAVIOR ----------
+    above = rv_label == "ABOVE_USUAL"
+    building = oi_label == "OI_BUILDING"
+    behavior = np.select(
+        [
+            above & (rvol_label == "COMPRESSED") & building,
+            above & (rvol_label == "EXPANDING") & building,
+            oi_label == "OI_UNWINDING",
+            rv_label == "BELOW_USUAL"
+        ],
+        ["ACCUMULATION_LIKE", "HEALTHY_PARTICIPATION", "EXIT_LIKE", "LOW_ENGAGEMENT"],
+        "MIXED"
+    )
+
+    # ---------- VERDICT ----------
+    verdict = np.select(
+        [
+            np.isin(behavior, ["LOW_ENGAGEMENT", "EXIT_LIKE"]),
+            behavior == "ACCUMULATION_LIKE"
+        ],
+        [VERDICT_NO_TRADE, VERDICT_WATCH],
+        VERDICT_MONITOR
+    )
+
+    return {
+        "rv_ratio": rv_ratio,
+        "rvol_ratio": rvol_ratio,
+        "rv_label": rv_label,
+        "rvol_label": rvol_label,
+        "oi_label": oi_label,
+        "behavior": behavior,
+        "verdict": verdict
+    }
+
+# ==================================================
+# CONVENIENCE WRAPPERS
+# ==================================================
+def evaluate_batch(candle_payloads, tickers, oi_payloads):
+    """Payload OKX mentah untuk N instrumen → list dict label per instrumen."""
+    high, low, vol_quote = stack_candles(candle_payloads)
+    oi_first, oi_last = stack_oi(oi_payloads)
+    labels = compute_labels(high, low, vol_quote, stack_tickers(tickers), oi_first, oi_last)
+
+    return [
+        {k: v[i].item() for k, v in labels.items()}
+        for i in range(len(candle_payloads))
+    ]
+
+def evaluate_stats(snapshots, tickers, oi_payloads):
+    """
+    Seperti evaluate_batch, tapi dari snapshot RollingCandleStats
+    (tanpa menghitung ulang median/mean seluruh window).
+    """
+    def col(key):
+        return np.array([s[key] for s in snapshots], dtype=np.float64)
+
+    oi_first, oi_last = stack_oi(oi_payloads)
+    labels = classify(
+        col("avg_range"),
+        col("median_range"),
+        col("median_vol"),
+        col("bar_count"),
+        stack_tickers(tickers),
+        oi_first,
+        oi_last
+    )
+
+    return [
+        {k: v[i].item() for k, v in labels.items()}
+        for i in range(len(snapshots))
+    ]
+
+def evaluate_one(candles, ticker, oi_hist):
+    return evaluate_batch([candles], [ticker], [oi_hist])[0]
+
+def mark_oi_unknown(ctx):
+    """
+    OI terlewat deadline: oi_label INERT (bawaan OI kosong) ditandai
+    OI_UNKNOWN. Behavior & verdict tetap dihitung tanpa info OI.
+    """
+    return {**ctx, "oi_label": OI_UNKNOWN}
@@ -0,0 +1,164 @@
+import sqlite3
+import threading
+import time
+
+from .wib import WIB_FORMAT, wib_now, wib_since
+
+# ==================================================
+# CONFIG
+# ==================================================
+FEED_DB_FILE = "decision_feed.db"
+POLL_SECONDS = 1.0           # cek PRAGMA data_version (tanpa baca data)
+KEEP_SECONDS = 7 * 24 * 3600  # event lebih lama dihapus saat publish
+WATCH_HOURS = 24             # window pair yang disimpan di memori
+
+# ==================================================
+# FEED (SQLITE, DITULIS CONTEXT GATE)
+# ==================================================
+class DecisionFeed:
+    """
+    Channel keputusan TAKEN antar aplikasi (proses terpisah).
+    Context Gate publish; Risk Manager membaca lewat FeedWatcher.
+    """
+
+    def __init__(self, path=FEED_DB_FILE):
+        self.path = path
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS decisions (
+                seq INTEGER PRIMARY KEY,
+                pair TEXT NOT NULL,
+                inst_id TEXT,
+                datetime_wib TEXT NOT NULL,
+                decision TEXT NOT NULL,
+                published_at REAL NOT NULL
+            )
+        """)
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def publish(self, pair, inst_id, datetime_wib, decision="TAKEN"):
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO decisions (pair, inst_id, datetime_wib, decision, published_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (pair, inst_id, datetime_wib, decision, now)
+        )
+        conn.execute("DELETE FROM decisions WHERE published_at < ?", (now - KEEP_SECONDS,))
+        conn.commit()
+
+    def after(self, seq, since=None):
+        """Event dengan seq > `seq` (opsional datetime_wib >= since), urut seq."""
+        sql = "SELECT seq, pair, datetime_wib, decision FROM decisions WHERE seq > ?"
+        params = [seq]
+        if since is not None:
+            sql += " AND datetime_wib >= ?"
+            params.append(since)
+        return self._conn().execute(sql + " ORDER BY seq", params).fetchall()
+
+# ==================================================
+# WATCHER (THREAD, DIPAKAI RISK MANAGER)
+# ==================================================
+class FeedWatcher:
+    """
+    Menyimpan pair TAKEN terbaru di memori.
+    Thread background hanya mengecek PRAGMA data_version (berubah saat
+    proses lain commit); event baru dibaca hanya setelah perubahan itu.
+    """
+
+    def __init__(self, feed, watch_hours=WATCH_HOURS, poll=POLL_SECONDS):
+        self.feed = feed
+        self.watch_hours = watch_hours
+        self.poll = poll
+        self._latest = {}   # pair → datetime_wib TAKEN terakhir
+        self._seq = 0
+        self._version = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._conn = None
+
+    def seed(self, pairs):
+        """Isi awal [(pair, datetime_wib)] (mis. dari jurnal lama), sekali saat start."""
+        with self._lock:
+            for pair, t in pairs:
+                if t > self._latest.get(pair, ""):
+                    self._latest[pair] = t
+            self._version += 1
+
+    def _apply(self, events):
+        if not events:
+            return
+        with self._lock:
+            for seq, pair, t, decision in events:
+                self._seq = max(self._seq, seq)
+                if decision == "TAKEN" and t > self._latest.get(pair, ""):
+                    self._latest[pair] = t
+            self._version += 1
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._apply(self.feed.after(0, wib_since(self.watch_hours)))
+        self._thread = threading.Thread(target=self._run, name="decision-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        # Koneksi sendiri: data_version hanya berubah karena commit koneksi lain
+        self._conn = sqlite3.connect(self.feed.path, timeout=30)
+        last = None
+        while not self._stop.wait(self.poll):
+            try:
+                version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+                if version != last:
+                    last = version
+                    self._apply(self.feed.after(self._seq))
+            except sqlite3.Error:
+                pass  # db terkunci sesaat → coba lagi siklus berikutnya
+
+    # ---------- READ (MEMORI SAJA) ----------
+    def version(self):
+        """Naik setiap ada event baru (untuk memo di UI)."""
+        return self._version
+
+    def recent_pairs(self, max_hours, limit):
+        """Pair TAKEN dalam max_hours terakhir, terbaru dulu."""
+        since = wib_since(max_hours)
+        with self._lock:
+            items = [(p, t) for p, t in self._latest.items() if t >= since]
+        items.sort(key=lambda pt: pt[1], reverse=True)
+        return [p for p, _ in items[:limit]]
+
+# ==================================================
+# SHARED INSTANCE
+# ==================================================
+_feed = None
+_feed_lock = threading.Lock()
+
+def get_feed():
+    """Feed bersama satu proses."""
+    global _feed
+    with _feed_lock:
+        if _feed is None:
+            _feed = DecisionFeed()
+        return _feed
+
+def publish_decision(pair, inst_id, decision, datetime_wib=None):
+    """Publish keputusan TAKEN (keputusan lain diabaikan)."""
+    if decision != "TAKEN":
+        return
+    get_feed().publish(pair, inst_id, datetime_wib or wib_now().strftime(WIB_FORMAT), decision)
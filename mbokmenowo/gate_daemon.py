@@ -0,0 +1,160 @@
+"""
+Context Gate tanpa Streamlit: scan watchlist terjadwal tiap candle 15m close.
+
+    python -m mbokmenowo.gate_daemon BTC ETH SOL
+    python -m mbokmenowo.gate_daemon --watchlist-file watchlist.txt --sink journal
+    python -m mbokmenowo.gate_daemon BTC ETH --once
+
+Proses berumur panjang: client OKX (connection pool), candle store
+(sync incremental) dan index instrumen dipakai ulang antar siklus.
+"""
+import argparse
+import logging
+import signal
+import threading
+import time
+
+from .candle_store import BAR_MS, get_store, sync_candles
+from .context_engine import VERDICT_MONITOR, evaluate_batch
+from .instruments import get_instruments
+from .journal_service import get_journal_service
+from .journal_store import CONTEXT_JOURNAL, CONTEXT_LABELS
+from .market import fetch_markets
+from .okx_client import get_client
+from .wib import WIB_FORMAT, trading_session, wib_now
+
+log = logging.getLogger(__name__)
+
+# ==================================================
+# CONFIG
+# ==================================================
+BAR = "15m"
+CLOSE_DELAY_SECONDS = 5   # tunggu candle close ter-confirm di OKX
+DEFAULT_WATCHLIST = ["BTC", "ETH", "SOL", "XRP", "DOGE", "BNB", "ADA", "AVAX", "LINK", "SUI"]
+AUTO_DECISION = "AUTO"    # decision di context journal (bukan TAKEN/SKIPPED)
+
+# ==================================================
+# PIPELINE (FETCH → LABEL → VERDICT)
+# ==================================================
+class GateRunner:
+    """Satu siklus scan watchlist; state (client, store, index) dipakai ulang."""
+
+    def __init__(self, bases, sink="labels"):
+        self.bases = bases
+        self.sink = sink
+        self.client = get_client()
+        self.store = get_store()
+        self.journal = get_journal_service(CONTEXT_LABELS if sink == "labels" else CONTEXT_JOURNAL)
+
+    def _candles(self, inst):
+        return sync_candles(self.client, self.store, inst, BAR, 96)
+
+    def _ticker(self, inst):
+        data = self.client.get_data("/api/v5/market/ticker", {"instId": inst})
+        return data[0] if data else None
+
+    def _oi_history(self, inst):
+        return self.client.get_data(
+            "/api/v5/public/open-interest-history",
+            {"instId": inst, "period": BAR, "limit": 6}
+        )
+
+    def run_once(self):
+        """Scan seluruh watchlist, tulis hasil; return list (base, label dict)."""
+        index = get_instruments(self.client)  # refresh hanya jika basi
+        markets = fetch_markets(
+            self.bases, self._candles, self._ticker, self._oi_history, index=index
+        )
+        found = [b for b in self.bases if b in markets]
+        contexts = evaluate_batch(
+            [markets[b][1] for b in found],
+            [markets[b][2] for b in found],
+            [markets[b][3] for b in found]
+        )
+
+        now = wib_now()
+        session = trading_session(now.hour)
+        for base, ctx in zip(found, contexts):
+            inst, candles = markets[base][0], markets[base][1]
+            row = {
+                "datetime_wib": now.strftime(WIB_FORMAT),
+                "pair": base,
+                "inst_id": inst,
+                "session": session,
+                **{k: ctx[k] for k in ("rv_label", "rvol_label", "oi_label", "behavior", "verdict")}
+            }
+            if self.sink == "labels":
+                row.update(
+                    candle_ts=int(candles[0][0]),
+                    rv_ratio=ctx["rv_ratio"],
+                    rvol_ratio=ctx["rvol_ratio"]
+                )
+            else:
+                row.update(decision=AUTO_DECISION, note="gate_daemon")
+            self.journal.append(row, wait=False)
+
+        self.journal.flush()  # semua pair satu siklus = satu batch write
+        return list(zip(found, contexts))
+
+# ==================================================
+# SCHEDULE (SELARAS CANDLE CLOSE)
+# ==================================================
+def next_close(now=None, bar=BAR, delay=CLOSE_DELAY_SECONDS):
+    """Epoch detik candle `bar` berikutnya close (+ delay)."""
+    now = time.time() if now is None else now
+    step = BAR_MS[bar] / 1000
+    return (now // step + 1) * step + delay
+
+def run_forever(runner, bar=BAR, delay=CLOSE_DELAY_SECONDS, stop=None):
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        wake = next_close(bar=bar, delay=delay)
+        if stop.wait(max(0.0, wake - time.time())):
+            break
+
+        started = time.perf_counter()
+        try:
+            results = runner.run_once()
+        except Exception:  # satu siklus gagal tidak mematikan daemon
+            log.exception("Siklus scan gagal")
+            continue
+
+        elapsed = (time.perf_counter() - started) * 1000
+        monitor = [b for b, c in results if c["verdict"] == VERDICT_MONITOR]
+        print(
+            f"{wib_now().strftime(WIB_FORMAT)} {len(results)}/{len(runner.bases)} pair "
+            f"• {elapsed:.0f} ms • dipantau: {', '.join(monitor) or '-'}",
+            flush=True
+        )
+
+# ==================================================
+# CLI
+# ==================================================
+def _read_watchlist(path):
+    with open(path, encoding="utf-8") as f:
+        return [b for line in f for b in line.replace(",", " ").upper().split()]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Context Gate headless (scan terjadwal)")
+    parser.add_argument("bases", nargs="*", help="simbol dasar, misal BTC ETH (default watchlist bawaan)")
+    parser.add_argument("--watchlist-file", help="file berisi simbol (spasi/koma/baris baru)")
+    parser.add_argument("--sink", choices=["labels", "journal"], default="labels",
+                        help="labels = tabel context_labels; journal = context gate journal (decision AUTO)")
+    parser.add_argument("--once", action="store_true", help="satu siklus sekarang, lalu keluar")
+    parser.add_argument("--delay", type=float, default=CLOSE_DELAY_SECONDS, help="detik setelah candle close")
+    args = parser.parse_args()
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    bases = args.bases or (_read_watchlist(args.watchlist_file) if args.watchlist_file else DEFAULT_WATCHLIST)
+    bases = list(dict.fromkeys(b.upper() for b in bases))
+    runner = GateRunner(bases, args.sink)
+
+    if args.once:
+        for base, ctx in runner.run_once():
+            print(f"{base:8} {ctx['verdict']:24} {ctx['behavior']}")
+    else:
+        stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+        print(f"Context Gate daemon: {len(bases)} pair, tiap {BAR} close (+{args.delay:g}s)", flush=True)
+        run_forever(runner, delay=args.delay, stop=stop)
@@ -0,0 +1,134 @@
+import json
+import os
+import threading
+import time
+
+# ==================================================
+# CONFIG
+# ==================================================
+INSTRUMENTS_FILE = "instruments_swap.json"
+REFRESH_SECONDS = 24 * 60 * 60   # refresh harian
+RETRY_SECONDS = 5 * 60           # jeda coba ulang jika refresh gagal
+QUOTE_PRIORITY = ["USDT", "USD"]  # urutan sama dengan fallback lama
+
+META_FIELDS = ["instId", "uly", "settleCcy", "ctVal", "ctValCcy", "ctType",
+               "tickSz", "lotSz", "minSz", "lever", "state"]
+
+# ==================================================
+# INSTRUMENT INDEX (SWAP)
+# ==================================================
+class InstrumentIndex:
+    """
+    Index instrumen SWAP OKX dari satu call /public/instruments.
+    Disimpan ke disk dan di-refresh harian; resolve base → instId O(1)
+    tanpa request. Menyimpan tickSz / ctVal untuk sizing.
+    """
+
+    def __init__(self, path=INSTRUMENTS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._by_inst = {}
+        self._by_base = {}
+        self._fetched_at = 0.0
+        self._next_try = 0.0
+        self._load()
+
+    # ---------- BUILD ----------
+    def _build(self, instruments, fetched_at):
+        by_inst = {}
+        by_base = {}
+        for d in instruments:
+            if d.get("state") != "live":
+                continue
+            inst = d["instId"]
+            base, quote = inst.split("-")[:2]
+            by_inst[inst] = {k: d.get(k) for k in META_FIELDS}
+            by_base.setdefault(base, []).append((quote, inst))
+
+        rank = {q: i for i, q in enumerate(QUOTE_PRIORITY)}
+        self._by_inst = by_inst
+        self._by_base = {
+            base: [inst for _, inst in sorted(pairs, key=lambda p: (rank.get(p[0], len(rank)), p[1]))]
+            for base, pairs in by_base.items()
+        }
+        self._fetched_at = fetched_at
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+            self._build(saved["instruments"], saved["fetched_at"])
+        except (OSError, ValueError, KeyError):
+            pass  # file rusak → dianggap belum ada, refresh berikutnya menimpa
+
+    def _save(self, instruments, fetched_at):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"fetched_at": fetched_at, "instruments": instruments}, f)
+        os.replace(tmp, self.path)
+
+    # ---------- REFRESH ----------
+    def is_stale(self):
+        return time.time() - self._fetched_at >= REFRESH_SECONDS
+
+    def refresh(self, client, force=False):
+        """
+        Ambil ulang daftar SWAP jika sudah basi (atau force).
+        Gagal fetch → index lama tetap dipakai, dicoba lagi setelah RETRY_SECONDS.
+        Return True jika index diperbarui.
+        """
+        now = time.time()
+        if not force and (not self.is_stale() or now < self._next_try):
+            return False
+
+        with self._lock:
+            if not force and not self.is_stale():
+                return False  # sudah di-refresh thread lain
+            instruments = client.get_data("/api/v5/public/instruments", {"instType": "SWAP"})
+            if not instruments:
+                self._next_try = now + RETRY_SECONDS
+                return False
+            instruments = [{k: d.get(k) for k in META_FIELDS} for d in instruments]
+            self._save(instruments, now)
+            self._build(instruments, now)
+            return True
+
+    # ---------- LOOKUP ----------
+    def __bool__(self):
+        return bool(self._by_inst)
+
+    def candidates(self, base):
+        """instId SWAP aktif untuk base (USDT dulu, lalu USD); [] jika tidak ada."""
+        return list(self._by_base.get(base, []))
+
+    def meta(self, inst):
+        """Metadata instrumen (tickSz, ctVal, lotSz, ...) atau None."""
+        return self._by_inst.get(inst)
+
+    def bases(self):
+        """Semua base asset, urut abjad (untuk autocomplete)."""
+        return sorted(self._by_base)
+
+    def fetched_at(self):
+        return self._fetched_at
+
+# ==================================================
+# SHARED INSTANCE
+# ==================================================
+_index = None
+_index_lock = threading.Lock()
+
+def get_instruments(client=None):
+    """
+    Index bersama satu proses. Dengan client, sekaligus refresh jika basi
+    (cek waktu saja; request hanya sekali sehari).
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = InstrumentIndex()
+    if client is not None:
+        _index.refresh(client)
+    return _index
@@ -0,0 +1,146 @@
+import argparse
+import glob
+import gzip
+import json
+import os
+from datetime import datetime
+
+from .perf_metrics import timed
+
+# ==================================================
+# CONFIG
+# ==================================================
+BACKUP_DIR = "backups"
+SNAPSHOT_EVERY = 200    # snapshot penuh setelah N delta
+KEEP_SNAPSHOTS = 14     # rotasi: simpan N snapshot terakhir (+ delta-nya)
+
+# ==================================================
+# INCREMENTAL BACKUP (SNAPSHOT GZIP + DELTA LOG)
+# ==================================================
+class JournalBackup:
+    """
+    Backup jurnal:
+    - Snapshot penuh terkompresi  : {name}_snapshot_{sid}.jsonl.gz
+    - Delta setiap simpan (append): {name}_delta_{sid}.jsonl.gz
+    Snapshot baru dibuat sekali sehari atau setelah SNAPSHOT_EVERY delta.
+    Restore = snapshot + replay delta-nya.
+    """
+
+    def __init__(self, name="journal", backup_dir=BACKUP_DIR,
+                 snapshot_every=SNAPSHOT_EVERY, keep=KEEP_SNAPSHOTS):
+        self.name = name
+        self.dir = backup_dir
+        self.snapshot_every = snapshot_every
+        self.keep = keep
+        self._delta_count = None
+        os.makedirs(self.dir, exist_ok=True)
+
+    # ---------- PATHS ----------
+    def _snapshot_path(self, sid):
+        return os.path.join(self.dir, f"{self.name}_snapshot_{sid}.jsonl.gz")
+
+    def _delta_path(self, sid):
+        return os.path.join(self.dir, f"{self.name}_delta_{sid}.jsonl.gz")
+
+    def snapshots(self):
+        """ID snapshot, terlama → terbaru."""
+        prefix = f"{self.name}_snapshot_"
+        paths = glob.glob(os.path.join(self.dir, f"{prefix}*.jsonl.gz"))
+        return sorted(os.path.basename(p)[len(prefix):-len(".jsonl.gz")] for p in paths)
+
+    def _current(self):
+        sids = self.snapshots()
+        return sids[-1] if sids else None
+
+    # ---------- WRITE ----------
+    def _write_snapshot(self, rows):
+        sid = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        tmp = self._snapshot_path(sid) + ".tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            for r in rows:
+                f.write(json.dumps(r, default=str) + "\n")
+        os.replace(tmp, self._snapshot_path(sid))
+        self._delta_count = 0
+        self.rotate()
+        return sid
+
+    def _snapshot_due(self, sid):
+        if sid is None or not sid.startswith(datetime.now().strftime("%Y%m%d")):
+            return True  # belum ada snapshot hari ini
+        if self._delta_count is None:
+            self._delta_count = sum(1 for _ in self._read_deltas(sid))
+        return self._delta_count >= self.snapshot_every
+
+    @timed("backup.save")
+    def save(self, op, row_id, fields, rows):
+        """
+        Catat satu perubahan jurnal.
+        op: "insert" / "update"; rows: isi jurnal terkini (untuk snapshot).
+        """
+        sid = self._current()
+        if self._snapshot_due(sid):
+            return self._write_snapshot(rows)
+
+        # gzip mode append = member baru, tetap terbaca sebagai satu stream
+        record = {"at": datetime.now().isoformat(), "op": op, "id": row_id, "fields": fields}
+        with gzip.open(self._delta_path(sid), "at", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+        self._delta_count += 1
+        return sid
+
+    def rotate(self):
+        for sid in self.snapshots()[:-self.keep]:
+            for p in (self._snapshot_path(sid), self._delta_path(sid)):
+                if os.path.exists(p):
+                    os.remove(p)
+
+    # ---------- RESTORE ----------
+    def _read_deltas(self, sid):
+        path = self._delta_path(sid)
+        if not os.path.exists(path):
+            return
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def restore(self, sid=None):
+        """Rekonstruksi isi jurnal dari snapshot (default terbaru) + delta."""
+        sid = sid or self._current()
+        if sid is None:
+            return []
+
+        with gzip.open(self._snapshot_path(sid), "rt", encoding="utf-8") as f:
+            rows = {r["id"]: r for r in map(json.loads, f) if r}
+
+        for d in self._read_deltas(sid):
+            if d["op"] == "insert":
+                rows[d["id"]] = {"id": d["id"], **d["fields"]}
+            elif d["op"] == "update":
+                rows.setdefault(d["id"], {"id": d["id"]}).update(d["fields"])
+
+        return [rows[k] for k in sorted(rows)]
+
+# ==================================================
+# CLI
+# ==================================================
+if __name__ == "__main__":
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Backup jurnal: list / restore")
+    parser.add_argument("command", choices=["list", "restore"])
+    parser.add_argument("snapshot", nargs="?", help="ID snapshot (default: terbaru)")
+    parser.add_argument("--name", default="journal")
+    parser.add_argument("--out", default="journal_restored.csv")
+    args = parser.parse_args()
+
+    backup = JournalBackup(args.name)
+
+    if args.command == "list":
+        for sid in backup.snapshots():
+            n = sum(1 for _ in backup._read_deltas(sid))
+            print(f"{sid}  (+{n} delta)")
+    else:
+        rows = backup.restore(args.snapshot)
+        pd.DataFrame(rows).to_csv(args.out, index=False)
+        print(f"{len(rows)} baris → {args.out}")
@@ -0,0 +1,210 @@
+import atexit
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+
+from .journal_store import open_journal
+from .perf_metrics import span
+
+log = logging.getLogger(__name__)
+
+# ==================================================
+# CONFIG
+# ==================================================
+BATCH_MAX = 256   # write maksimum per transaksi / rewrite
+
+# ==================================================
+# SINGLE-WRITER JOURNAL SERVICE
+# ==================================================
+class JournalService:
+    """
+    Satu writer per jurnal per proses.
+    - Semua sesi / tab mengantrekan write; thread writer mengambil
+      seluruh antrean (batch) lalu menulisnya sekaligus lewat
+      backend.apply (satu transaksi SQLite / satu append atau rename CSV).
+    - View baris bersama di memori dibaca semua sesi tanpa salinan per sesi.
+      View adalah tuple yang diganti per batch; jangan diubah langsung.
+    """
+
+    def __init__(self, backend, batch_max=BATCH_MAX):
+        self.backend = backend
+        self.columns = backend.columns
+        self.batch_max = batch_max
+        self._queue = queue.Queue()
+        self._lock = threading.RLock()  # dipegang writer selama commit + update view
+        self._view = None   # dimuat saat pertama dibaca
+        self._pos = {}      # id → posisi di view
+        self._version = 0
+        self._listeners = {}  # key → fn; diganti utuh (copy-on-write)
+
+        self._thread = threading.Thread(
+            target=self._run, name=f"journal-{backend.spec['table']}", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ---------- WRITE (ANTRE) ----------
+    def _submit(self, op, row_id, fields, wait):
+        fut = Future()
+        self._queue.put((op, row_id, fields, fut))
+        return fut.result() if wait else fut
+
+    def append(self, row, wait=True):
+        """Antrekan INSERT; return id setelah commit (wait=False → Future)."""
+        row = {c: row.get(c) for c in self.columns}
+        return self._submit("insert", None, row, wait)
+
+    def update(self, row_id, fields, wait=True):
+        """Antrekan UPDATE beberapa kolom satu baris."""
+        return self._submit("update", row_id, dict(fields), wait)
+
+    def flush(self):
+        """Tunggu semua write yang sudah diantre selesai ditulis."""
+        if self._thread.is_alive():
+            self._submit("flush", None, None, True)
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def add_listener(self, fn, key=None):
+        """
+        fn(op, row_id, fields) dipanggil di thread writer setelah commit (berurutan).
+        Service hidup sepanjang proses: listener dengan key yang sama
+        menggantikan yang lama (cache_resource di-clear / script reload
+        tidak menggandakan listener).
+        """
+        with self._lock:
+            self._listeners = {**self._listeners, key or fn: fn}
+
+    # ---------- WRITER THREAD ----------
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = []
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.batch_max:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._commit(batch)
+            if item is None:
+                return
+
+    def _write(self, writes):
+        """
+        backend.apply untuk seluruh batch; jika gagal, ulang per op agar
+        hanya op yang bermasalah yang gagal. Return hasil per op (id / Exception).
+        """
+        ops = [(op, rid, f) for op, rid, f, _ in writes]
+        try:
+            with span("journal.batch"):
+                return self.backend.apply(ops)
+        except Exception as e:
+            if len(ops) == 1:
+                return [e]
+        results = []
+        for op in ops:
+            try:
+                results.append(self.backend.apply([op])[0])
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _commit(self, batch):
+        writes = [b for b in batch if b[0] != "flush"]
+        results = []
+        try:
+            with self._lock:
+                if writes:
+                    results = self._write(writes)
+                    done = [(w, r) for w, r in zip(writes, results) if not isinstance(r, Exception)]
+                    if done:
+                        self._apply_view(*zip(*done))
+                        self._version += 1
+        except Exception as e:
+            for *_, fut in batch:
+                fut.set_exception(e)
+            return
+
+        for (op, _, fields, _), row_id in zip(writes, results):
+            if isinstance(row_id, Exception):
+                continue
+            for fn in self._listeners.values():
+                try:
+                    fn(op, row_id, fields)
+                except Exception:  # backup dsb. gagal tidak membatalkan commit
+                    log.exception("Listener jurnal %s gagal", self.backend.spec["table"])
+
+        results = iter(results)
+        for op, *_, fut in batch:
+            result = None if op == "flush" else next(results)
+            if isinstance(result, Exception):
+                fut.set_exception(result)
+            else:
+                fut.set_result(result)
+
+    def _apply_view(self, writes, ids):
+        if self._view is None:
+            return
+        view = list(self._view)
+        for (op, _, fields, _), row_id in zip(writes, ids):
+            if op == "insert":
+                self._pos[row_id] = len(view)
+                view.append({"id": row_id, **fields})
+            elif row_id in self._pos:
+                i = self._pos[row_id]
+                view[i] = {**view[i], **fields}
+        self._view = tuple(view)
+
+    # ---------- READ (VIEW BERSAMA) ----------
+    def rows(self):
+        """Semua baris (tuple dict, urut id). Dimuat dari disk sekali per proses."""
+        view = self._view
+        if view is not None:
+            return view
+        with self._lock:
+            if self._view is None:
+                rows = self.backend.rows()
+                self._pos = {r["id"]: i for i, r in enumerate(rows)}
+                self._view = tuple(rows)
+            return self._view
+
+    def get(self, row_id):
+        rows = self.rows()
+        return rows[self._pos[row_id]]
+
+    def snapshot(self):
+        """(version, rows) yang saling cocok."""
+        self.rows()
+        with self._lock:
+            return self._version, self._view
+
+    def version(self):
+        """Naik setiap batch commit (penanda view untuk memoization)."""
+        return self._version
+
+    def recent_latest(self, *args, **equals):
+        return self.backend.recent_latest(*args, **equals)
+
+    def export_csv(self):
+        return self.backend.export_csv()
+
+# ==================================================
+# SHARED INSTANCE (PER JURNAL)
+# ==================================================
+_services = {}
+_services_lock = threading.Lock()
+
+def get_journal_service(spec):
+    """Service bersama satu proses untuk jurnal `spec`."""
+    with _services_lock:
+        if spec["table"] not in _services:
+            _services[spec["table"]] = JournalService(open_journal(spec))
+        return _services[spec["table"]]
@@ -0,0 +1,449 @@
+import csv
+import os
+import re
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+
+from .perf_metrics import timed
+
+# ==================================================
+# CONFIG
+# ==================================================
+# "sqlite" (default) atau "csv"
+JOURNAL_BACKEND = os.environ.get("JOURNAL_BACKEND", "sqlite")
+JOURNAL_DB_FILE = "journal.db"
+TIME_PREFIX = re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}")  # WIB_FORMAT / ISO
+
+# ==================================================
+# JOURNAL SPECS (SCHEMA PER JURNAL)
+# ==================================================
+CONTEXT_JOURNAL = {
+    "table": "context_gate_journal",
+    "csv": "context_gate_journal.csv",
+    "columns": {
+        "datetime_wib": "TEXT",
+        "pair": "TEXT",
+        "inst_id": "TEXT",
+        "session": "TEXT",
+        "rv_label": "TEXT",
+        "rvol_label": "TEXT",
+        "oi_label": "TEXT",
+        "behavior": "TEXT",
+        "verdict": "TEXT",
+        "decision": "TEXT",
+        "note": "TEXT"
+    },
+    "time_column": "datetime_wib",   # partisi tanggal ekspor Parquet (columnar)
+    "indexes": [
+        ("decision", "datetime_wib"),
+        ("pair",)
+    ]
+}
+
+# Label hasil scan terjadwal (gate_daemon), terpisah dari keputusan manual
+CONTEXT_LABELS = {
+    "table": "context_labels",
+    "csv": "context_labels.csv",
+    "columns": {
+        "datetime_wib": "TEXT",
+        "candle_ts": "INTEGER",
+        "pair": "TEXT",
+        "inst_id": "TEXT",
+        "session": "TEXT",
+        "rv_label": "TEXT",
+        "rvol_label": "TEXT",
+        "oi_label": "TEXT",
+        "behavior": "TEXT",
+        "verdict": "TEXT",
+        "rv_ratio": "REAL",
+        "rvol_ratio": "REAL"
+    },
+    "time_column": "datetime_wib",
+    "indexes": [
+        ("pair", "datetime_wib"),
+        ("verdict",)
+    ]
+}
+
+TRADE_JOURNAL = {
+    "table": "trades",
+    "csv": "journal.csv",
+    "columns": {
+        "timestamp": "TEXT",
+        "pair": "TEXT",
+        "pair_source": "TEXT",
+        "direction": "TEXT",
+        "entry": "REAL",
+        "sl": "REAL",
+        "risk_percent": "REAL",
+        "bias_score": "INTEGER",
+        "position_size": "REAL",
+        "margin": "REAL",
+        "trade_status": "TEXT",
+        "result_r": "REAL",
+        "exit_reason": "TEXT"
+    },
+    "time_column": "timestamp",
+    "indexes": [
+        ("pair",),
+        ("trade_status",)
+    ]
+}
+
+# ==================================================
+# CSV HELPERS (APPEND-ONLY)
+# ==================================================
+def read_header(path):
+    """Baca hanya baris header CSV (tanpa memuat seluruh jurnal)."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+def init_csv(path, columns):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerow(columns)
+
+def ensure_csv_schema(path, columns, backup_suffix):
+    """
+    Buat jurnal jika belum ada. Jika header tidak cocok,
+    file lama di-rename ke backup (tanpa baca ulang isi) lalu dibuat baru.
+    Return path backup atau None.
+    """
+    if not os.path.exists(path):
+        init_csv(path, columns)
+        return None
+
+    if read_header(path) == columns:
+        return None
+
+    backup_path = path.replace(".csv", f"_backup_{backup_suffix}.csv")
+    os.replace(path, backup_path)
+    init_csv(path, columns)
+    return backup_path
+
+def append_rows(path, rows):
+    """Tambah baris + satu fsync. Biaya konstan, tidak tergantung ukuran jurnal."""
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(["" if v is None else v for v in row] for row in rows)
+        f.flush()
+        os.fsync(f.fileno())
+
+def append_row(path, row):
+    append_rows(path, [row])
+
+def _records(df):
+    # NaN → None supaya cek `is None` konsisten dengan data baru
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+# ==================================================
+# CSV BACKEND
+# ==================================================
+class CsvJournal:
+    """
+    Backend CSV (kompatibel format lama).
+    id = nomor baris data (0-based). Update tetap menulis ulang file.
+    """
+
+    def __init__(self, spec, path=None):
+        self.spec = spec
+        self.path = path or spec["csv"]
+        self.columns = list(spec["columns"])
+        if not os.path.exists(self.path):
+            init_csv(self.path, self.columns)
+        self._count = None  # (ukuran file, jumlah baris) terakhir diketahui
+
+    def _read(self):
+        import pandas as pd
+        return pd.read_csv(self.path)
+
+    def _row_count(self):
+        size = os.path.getsize(self.path)
+        if self._count is None or self._count[0] != size:
+            # File diubah dari luar → hitung ulang sekali
+            with open(self.path, newline="", encoding="utf-8") as f:
+                self._count = (size, sum(1 for _ in csv.reader(f)) - 1)
+        return self._count[1]
+
+    @timed("journal.csv.append")
+    def append(self, row):
+        row_id = self._row_count()
+        append_row(self.path, [row.get(c) for c in self.columns])
+        self._count = (os.path.getsize(self.path), row_id + 1)
+        return row_id
+
+    @timed("journal.csv.update")
+    def update(self, row_id, fields):
+        df = self._read()
+        self._set(df, row_id, fields)
+        self._write(df)
+
+    @staticmethod
+    def _set(df, row_id, fields):
+        # df.at dengan id tak dikenal diam-diam menambah baris NaN
+        if row_id not in df.index:
+            raise KeyError(row_id)
+        for k, v in fields.items():
+            df[k] = df[k].astype(object)
+            df.at[row_id, k] = v
+
+    def _write(self, df):
+        # Tulis ke file sementara lalu rename atomik (tidak pernah setengah jadi)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            df.to_csv(f, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._count = None
+
+    @timed("journal.csv.apply")
+    def apply(self, ops):
+        """
+        Tulis batch [(op, row_id, fields)] sekaligus; return id per op.
+        Insert saja → satu append + fsync; ada update → satu rewrite atomik.
+        """
+        if all(op == "insert" for op, _, _ in ops):
+            start = self._row_count()
+            append_rows(self.path, [[row.get(c) for c in self.columns] for _, _, row in ops])
+            self._count = (os.path.getsize(self.path), start + len(ops))
+            return list(range(start, start + len(ops)))
+
+        df = self._read()
+        ids = []
+        for op, row_id, fields in ops:
+            if op == "insert":
+                row_id = len(df)
+                df.loc[row_id] = [fields.get(c) for c in self.columns]
+            else:
+                self._set(df, row_id, fields)
+            ids.append(row_id)
+        self._write(df)
+        return ids
+
+    @timed("journal.csv.rows")
+    def rows(self):
+        df = self._read()
+        return [{"id": i, **r} for i, r in enumerate(_records(df))]
+
+    def find(self, **equals):
+        return [r for r in self.rows() if all(r.get(k) == v for k, v in equals.items())]
+
+    def version(self):
+        """Penanda perubahan file (untuk memoization)."""
+        st_ = os.stat(self.path)
+        return (st_.st_mtime_ns, st_.st_size)
+
+    def tail_rows(self, block_size=64 * 1024):
+        """
+        Baca baris dari akhir file ke awal (terbaru dulu) per blok,
+        tanpa memuat seluruh jurnal. Asumsi: satu record per baris.
+        """
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            rest = b""
+            while pos > 0:
+                step = min(block_size, pos)
+                pos -= step
+                f.seek(pos)
+                lines = (f.read(step) + rest).split(b"\n")
+                rest = lines.pop(0)  # mungkin baris terpotong
+                for line in reversed(lines):
+                    if line.strip():
+                        yield line.decode("utf-8")
+            # `rest` terakhir = header
+
+    @timed("journal.csv.recent_latest")
+    def recent_latest(self, column, time_column, since, **equals):
+        """
+        [(value, waktu terbaru)] urut terbaru dulu, hanya baris >= since.
+        Jurnal append-only → berhenti di baris pertama yang lebih tua.
+        Baris dengan waktu kosong / rusak dilewati (bukan batas berhenti).
+        """
+        header = read_header(self.path)
+        out = {}
+        for line in self.tail_rows():
+            row = dict(zip(header, next(csv.reader([line]))))
+            t = row.get(time_column) or ""
+            if not TIME_PREFIX.match(t):
+                continue
+            if t < since:
+                break
+            if all(row.get(k) == v for k, v in equals.items()) and row[column] not in out:
+                out[row[column]] = t
+        return sorted(out.items(), key=lambda kv: kv[1], reverse=True)
+
+    def export_csv(self):
+        with open(self.path, "rb") as f:
+            return f.read()
+
+# ==================================================
+# SQLITE BACKEND (WAL + INDEX)
+# ==================================================
+class SqliteJournal:
+    """
+    Backend SQLite mode WAL.
+    id = INTEGER PRIMARY KEY; update satu baris; query lewat index.
+    """
+
+    def __init__(self, spec, path=JOURNAL_DB_FILE):
+        self.spec = spec
+        self.path = path
+        self.table = spec["table"]
+        self.columns = list(spec["columns"])
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        cols = ", ".join(f"{c} {t}" for c, t in spec["columns"].items())
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table} (id INTEGER PRIMARY KEY, {cols})")
+        for idx in spec["indexes"]:
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{self.table}_{'_'.join(idx)} "
+                f"ON {self.table} ({', '.join(idx)})"
+            )
+        conn.execute("CREATE TABLE IF NOT EXISTS migrations (source TEXT PRIMARY KEY, migrated_at TEXT, row_count INTEGER)")
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _insert(self, conn, row):
+        return conn.execute(
+            f"INSERT INTO {self.table} ({', '.join(self.columns)}) "
+            f"VALUES ({', '.join('?' for _ in self.columns)})",
+            [row.get(c) for c in self.columns]
+        ).lastrowid
+
+    def _update(self, conn, row_id, fields):
+        cur = conn.execute(
+            f"UPDATE {self.table} SET {', '.join(f'{k}=?' for k in fields)} WHERE id=?",
+            [*fields.values(), row_id]
+        )
+        if cur.rowcount == 0:
+            raise KeyError(row_id)  # sama dengan backend CSV
+        return row_id
+
+    @timed("journal.sqlite.append")
+    def append(self, row):
+        conn = self._conn()
+        row_id = self._insert(conn, row)
+        conn.commit()
+        return row_id
+
+    @timed("journal.sqlite.update")
+    def update(self, row_id, fields):
+        conn = self._conn()
+        self._update(conn, row_id, fields)
+        conn.commit()
+
+    @timed("journal.sqlite.apply")
+    def apply(self, ops):
+        """Tulis batch [(op, row_id, fields)] dalam satu transaksi; return id per op."""
+        conn = self._conn()
+        with conn:  # commit sekali, rollback semua jika gagal
+            return [
+                self._insert(conn, fields) if op == "insert" else self._update(conn, row_id, fields)
+                for op, row_id, fields in ops
+            ]
+
+    @timed("journal.sqlite.rows")
+    def rows(self):
+        cur = self._conn().execute(f"SELECT * FROM {self.table} ORDER BY id")
+        return [dict(r) for r in cur]
+
+    def find(self, **equals):
+        where = " AND ".join(f"{k}=?" for k in equals) or "1"
+        cur = self._conn().execute(
+            f"SELECT * FROM {self.table} WHERE {where} ORDER BY id",
+            list(equals.values())
+        )
+        return [dict(r) for r in cur]
+
+    def version(self):
+        """Penanda perubahan (db + file WAL) untuk memoization."""
+        out = []
+        for p in (self.path, f"{self.path}-wal"):
+            if os.path.exists(p):
+                st_ = os.stat(p)
+                out += [st_.st_mtime_ns, st_.st_size]
+        return tuple(out)
+
+    @timed("journal.sqlite.recent_latest")
+    def recent_latest(self, column, time_column, since, **equals):
+        """[(value, waktu terbaru)] urut terbaru dulu, hanya baris >= since."""
+        where = " AND ".join([*(f"{k}=?" for k in equals), f"{time_column}>=?"])
+        cur = self._conn().execute(
+            f"SELECT {column}, MAX({time_column}) AS t FROM {self.table} "
+            f"WHERE {where} GROUP BY {column} ORDER BY t DESC",
+            [*equals.values(), since]
+        )
+        return [(r[0], r[1]) for r in cur]
+
+    def export_csv(self):
+        import pandas as pd
+        df = pd.DataFrame(self.rows(), columns=["id", *self.columns])
+        return df.drop(columns="id").to_csv(index=False).encode("utf-8")
+
+    # ---------- ONE-SHOT CSV MIGRATION ----------
+    def migrate_csv(self, csv_path=None):
+        """
+        Import CSV lama sekali saja (dicatat di tabel migrations).
+        Return jumlah baris yang diimport (0 jika sudah pernah).
+        """
+        csv_path = csv_path or self.spec["csv"]
+        if not os.path.exists(csv_path):
+            return 0
+
+        conn = self._conn()
+        source = os.path.abspath(csv_path)
+        if conn.execute("SELECT 1 FROM migrations WHERE source=?", (source,)).fetchone():
+            return 0
+
+        import pandas as pd
+        df = pd.read_csv(csv_path)
+        records = _records(df.reindex(columns=self.columns))
+        conn.executemany(
+            f"INSERT INTO {self.table} ({', '.join(self.columns)}) "
+            f"VALUES ({', '.join('?' for _ in self.columns)})",
+            [[r[c] for c in self.columns] for r in records]
+        )
+        conn.execute(
+            "INSERT INTO migrations VALUES (?, ?, ?)",
+            (source, datetime.now().isoformat(), len(records))
+        )
+        conn.commit()
+        return len(records)
+
+# ==================================================
+# FACTORY
+# ==================================================
+def open_journal(spec, backend=None):
+    """Buka jurnal sesuai backend; SQLite otomatis migrasi CSV lama sekali."""
+    backend = backend or JOURNAL_BACKEND
+    if backend == "csv":
+        return CsvJournal(spec)
+    if backend == "sqlite":
+        journal = SqliteJournal(spec)
+        journal.migrate_csv()
+        return journal
+    raise ValueError(f"Backend jurnal tidak dikenal: {backend}")
+
+# ==================================================
+# CLI: python -m mbokmenowo.journal_store migrate
+# ==================================================
+if __name__ == "__main__":
+    if sys.argv[1:] != ["migrate"]:
+        print("Pakai: python -m mbokmenowo.journal_store migrate")
+        sys.exit(1)
+
+    for spec in (CONTEXT_JOURNAL, TRADE_JOURNAL):
+        n = SqliteJournal(spec).migrate_csv()
+        print(f"{spec['csv']} → {JOURNAL_DB_FILE}:{spec['table']} ({n} baris)")
@@ -0,0 +1,94 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from .perf_metrics import propagate, span
+
+# ==================================================
+# CONFIG
+# ==================================================
+SCAN_MAX_WORKERS = 16
+
+# ==================================================
+# INSTRUMENT FALLBACK (ROBUST)
+# ==================================================
+def inst_candidates(base, index=None):
+    """
+    Kandidat instId untuk base.
+    Dengan InstrumentIndex terisi: hanya instrumen yang benar-benar ada
+    (base tak dikenal → [], tanpa request). Tanpa index: tebak USDT lalu USD.
+    """
+    if index:
+        return index.candidates(base)
+    return [
+        f"{base}-USDT-SWAP",
+        f"{base}-USD-SWAP"
+    ]
+
+def trade_inst(pair, index=None):
+    """
+    instId untuk pair di jurnal trade: simbol dasar ("BTC"),
+    gaya spot ("BTCUSDT") atau instId lengkap. None jika tidak dikenal.
+    """
+    pair = (pair or "").upper().strip()
+    if pair.endswith("-SWAP"):
+        return pair
+    base = pair.split("-")[0]
+    if base.endswith("USDT") and len(base) > 4:
+        base = base[:-4]
+    candidates = inst_candidates(base, index)
+    return candidates[0] if candidates else None
+
+# ==================================================
+# MARK PRICE (SATU REQUEST UNTUK SEMUA SWAP)
+# ==================================================
+def mark_prices(client):
+    """instId → markPx untuk seluruh SWAP ({} jika request gagal)."""
+    data = client.get_data("/api/v5/public/mark-price", {"instType": "SWAP"})
+    return {d["instId"]: float(d["markPx"]) for d in data if d.get("markPx")}
+
+# ==================================================
+# CONCURRENT FETCH (SCANNER)
+# ==================================================
+def fetch_markets(bases, get_candles, get_ticker, get_oi_history,
+                  max_workers=SCAN_MAX_WORKERS, index=None):
+    """
+    Fetch semua instrumen watchlist secara paralel (thread pool terbatas).
+    Setiap gelombang kandidat (USDT lalu USD) dikirim bersamaan,
+    sehingga waktu total ≈ request paling lambat, bukan jumlah pair.
+    Return dict base → (inst, candles, ticker, oi_hist); base tanpa data tidak ada.
+    """
+    markets = {}
+    candidates = {base: inst_candidates(base, index) for base in bases}
+    pending = [b for b in bases if candidates[b]]
+    waves = max((len(c) for c in candidates.values()), default=0)
+    fetch = [propagate(f) for f in (get_candles, get_ticker, get_oi_history)]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool, \
+            span("fallback.resolve", source="index" if index else "guess") as s:
+        for candidate_idx in range(waves):
+            pending = [b for b in pending if candidate_idx < len(candidates[b])]
+            if not pending:
+                break
+            s.label(attempts=candidate_idx + 1)
+
+            futures = {}
+            for base in pending:
+                inst = candidates[base][candidate_idx]
+                futures[base] = (inst, *(pool.submit(f, inst) for f in fetch))
+
+            still_pending = []
+            for base, (inst, f_c, f_t, f_oi) in futures.items():
+                try:
+                    c, t = f_c.result(), f_t.result()
+                    oi = f_oi.result()
+                except Exception:
+                    c, t, oi = [], None, []
+
+                if not c or not t:
+                    still_pending.append(base)
+                    continue
+
+                markets[base] = (inst, c, t, oi if oi else [])
+
+            pending = still_pending
+
+    return markets
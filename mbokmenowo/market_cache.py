@@ -0,0 +1,128 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FetchTimeout
+
+from .perf_metrics import propagate, span
+
+# ==================================================
+# CONFIG
+# ==================================================
+FETCH_WORKERS = 16       # refresh background paralel maksimum
+EVAL_DEADLINE_S = 3.0    # batas total satu evaluasi (halaman / scan)
+STALE_MAX_S = 3600       # data lebih tua dari ini tidak lagi disajikan
+
+# ==================================================
+# DEADLINE (SATU EVALUASI)
+# ==================================================
+class Deadline:
+    """
+    Batas waktu bersama untuk semua fetch satu evaluasi.
+    Mencatat (kind, inst) yang disajikan basi / tidak tiba tepat waktu /
+    fetch-nya gagal.
+    """
+
+    def __init__(self, seconds=EVAL_DEADLINE_S):
+        self.expires = time.monotonic() + seconds
+        self.stale = set()
+        self.late = set()
+        self.failed = set()
+
+    def remaining(self):
+        return max(0.0, self.expires - time.monotonic())
+
+# ==================================================
+# STALE-WHILE-REVALIDATE CACHE
+# ==================================================
+class MarketCache:
+    """
+    Cache data pasar bersama satu proses, key (kind, inst, ...).
+    - Segar (umur < ttl)  : langsung dari memori
+    - Basi                : data bagus terakhir langsung, refresh di background
+    - Belum ada           : tunggu refresh hanya sampai deadline
+    - Fetch gagal         : data bagus terakhir (berapa pun umurnya) atau None
+    Satu refresh per key sekaligus; request lambat tidak menahan halaman.
+    """
+
+    def __init__(self, workers=FETCH_WORKERS):
+        self._entries = {}   # key → (value, fetched_at)
+        self._inflight = {}  # key → Future
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="market-cache")
+
+    def _load(self, key, fetch):
+        try:
+            value = fetch()
+            with self._lock:
+                # Hasil kosong (request gagal) tidak menimpa data bagus terakhir
+                if value or key not in self._entries:
+                    self._entries[key] = (value, time.time())
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def refresh(self, key, fetch):
+        """Mulai refresh background (tidak dobel jika sudah berjalan); return Future."""
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is None:
+                fut = self._pool.submit(propagate(self._load), key, fetch)
+                self._inflight[key] = fut
+            return fut
+
+    def close(self):
+        """Hentikan pool refresh (cache milik sendiri, mis. benchmark)."""
+        self._pool.shutdown(wait=True)
+
+    def get(self, key, fetch, ttl, deadline=None):
+        """
+        Return value, atau None jika belum ada data dan refresh
+        tidak selesai sebelum deadline (deadline None = tunggu) / gagal.
+        Tidak pernah raise karena fetch.
+        """
+        kind, inst = key[0], key[1]
+        with span("cache.market", kind=kind) as s:
+            with self._lock:
+                entry = self._entries.get(key)
+            age = time.time() - entry[1] if entry else None
+
+            if entry and age < ttl:
+                s.label(cache="fresh")
+                return entry[0]
+
+            fut = self.refresh(key, fetch)
+            if entry and age < STALE_MAX_S:
+                s.label(cache="stale")
+                if deadline:
+                    deadline.stale.add((kind, inst))
+                return entry[0]
+
+            try:
+                value = fut.result(timeout=deadline.remaining() if deadline else None)
+                s.label(cache="miss")
+                return value
+            except FetchTimeout:
+                s.label(cache="timeout")
+                if deadline:
+                    deadline.late.add((kind, inst))
+                return None
+            except Exception:
+                s.label(cache="error")
+                if deadline:
+                    deadline.failed.add((kind, inst))
+                return entry[0] if entry else None
+
+# ==================================================
+# SHARED INSTANCE
+# ==================================================
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_market_cache():
+    """Cache bersama satu proses."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = MarketCache()
+        return _cache
@@ -0,0 +1,202 @@
+import os
+import random
+import threading
+import time
+
+from .perf_metrics import span
+
+# ==================================================
+# CONFIG
+# ==================================================
+# Bisa diarahkan ke stand-in lokal (bench/fake_okx.py)
+BASE_URL = os.environ.get("OKX_BASE_URL", "https://www.okx.com")
+
+# Rate limit publik OKX per IP: (jumlah request, per detik)
+RATE_LIMITS = {
+    "/api/v5/market/candles": (40, 2),
+    "/api/v5/market/history-candles": (20, 2),
+    "/api/v5/market/ticker": (20, 2),
+    "/api/v5/market/tickers": (20, 2),
+    "/api/v5/public/open-interest-history": (20, 2),
+    "/api/v5/public/instruments": (20, 2),
+    "/api/v5/public/mark-price": (10, 2),
+    "/api/v5/rubik/stat/contracts/open-interest-history": (5, 2),
+}
+DEFAULT_RATE_LIMIT = (10, 2)
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+RATE_LIMIT_CODE = "50011"  # OKX: "Too Many Requests"
+
+# ==================================================
+# TOKEN BUCKET (PER ENDPOINT)
+# ==================================================
+class TokenBucket:
+    """
+    Token bucket thread-safe.
+    capacity token terisi ulang penuh setiap `per` detik.
+    """
+
+    def __init__(self, capacity, per):
+        self.capacity = float(capacity)
+        self.rate = capacity / per
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity,
+                    self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+# ==================================================
+# OKX HTTP CLIENT (KEEP-ALIVE • THROTTLE • RETRY)
+# ==================================================
+class OKXClient:
+    """
+    Satu client untuk semua endpoint OKX.
+    - Session keep-alive + connection pool (tanpa handshake ulang)
+    - Throttle token bucket per endpoint
+    - Retry dengan jitter untuk 429 / 5xx / error jaringan
+    - Counter latency & error per endpoint
+    """
+
+    def __init__(self, base_url=BASE_URL, timeout=10, max_retries=3,
+                 backoff=0.5, pool_size=32):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+        # requests di-import saat client dibuat, bukan saat modul di-import
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self._net_errors = (requests.RequestException, ValueError)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._buckets = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, path):
+        with self._lock:
+            if path not in self._buckets:
+                capacity, per = RATE_LIMITS.get(path, DEFAULT_RATE_LIMIT)
+                self._buckets[path] = TokenBucket(capacity, per)
+            return self._buckets[path]
+
+    def _record(self, path, latency=None, error=False, retry=False):
+        with self._lock:
+            s = self._stats.setdefault(path, {
+                "calls": 0,
+                "errors": 0,
+                "retries": 0,
+                "latency_total_ms": 0.0,
+                "latency_max_ms": 0.0
+            })
+            if latency is not None:
+                ms = latency * 1000
+                s["calls"] += 1
+                s["latency_total_ms"] += ms
+                s["latency_max_ms"] = max(s["latency_max_ms"], ms)
+            if error:
+                s["errors"] += 1
+            if retry:
+                s["retries"] += 1
+
+    def _sleep_before_retry(self, attempt):
+        # Exponential backoff + full jitter
+        time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    def request(self, path, params=None):
+        """
+        GET ke OKX, return payload JSON (dict).
+        Gagal total → payload dengan code "-1" (tidak raise).
+        """
+        with span("okx.request", endpoint=path) as s:
+            payload = self._request(path, params)
+            s.label(code=payload.get("code"))
+        return payload
+
+    def _request(self, path, params):
+        bucket = self._bucket(path)
+        last_error = "unknown error"
+
+        for attempt in range(self.max_retries + 1):
+            bucket.acquire()
+            started = time.perf_counter()
+
+            try:
+                resp = self.session.get(
+                    f"{self.base_url}{path}",
+                    params=params,
+                    timeout=self.timeout
+                )
+                latency = time.perf_counter() - started
+
+                if resp.status_code in RETRY_STATUS:
+                    last_error = f"HTTP {resp.status_code}"
+                    self._record(path, latency, error=True)
+                else:
+                    payload = resp.json()
+                    if payload.get("code") == RATE_LIMIT_CODE:
+                        last_error = payload.get("msg", "rate limited")
+                        self._record(path, latency, error=True)
+                    else:
+                        self._record(path, latency, error=payload.get("code") != "0")
+                        return payload
+
+            except self._net_errors as e:
+                last_error = str(e)
+                self._record(path, time.perf_counter() - started, error=True)
+
+            if attempt < self.max_retries:
+                self._record(path, retry=True)
+                self._sleep_before_retry(attempt)
+
+        return {"code": "-1", "msg": last_error, "data": []}
+
+    def get_data(self, path, params=None):
+        """Return field `data` jika code == "0", selain itu list kosong."""
+        r = self.request(path, params)
+        return (r.get("data") or []) if r.get("code") == "0" else []
+
+    def stats(self):
+        with self._lock:
+            out = {}
+            for path, s in self._stats.items():
+                out[path] = {
+                    **s,
+                    "latency_avg_ms": s["latency_total_ms"] / s["calls"] if s["calls"] else 0.0
+                }
+            return out
+
+# ==================================================
+# SHARED INSTANCE
+# ==================================================
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Client bersama satu proses (dipakai semua session & thread)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OKXClient()
+        return _client
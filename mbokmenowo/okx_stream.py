@@ -0,0 +1,242 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from .rolling_stats import RollingCandleStats
+
+# ==================================================
+# CONFIG
+# ==================================================
+# Bisa diarahkan ke stand-in lokal (tools/ws_replay_server.py)
+WS_PUBLIC_URL = os.environ.get("OKX_WS_PUBLIC_URL", "wss://ws.okx.com:8443/ws/v5/public")
+WS_BUSINESS_URL = os.environ.get("OKX_WS_BUSINESS_URL", "wss://ws.okx.com:8443/ws/v5/business")
+
+CANDLE_CHANNEL = "candle15m"
+BAR_MS = 15 * 60_000
+PING_INTERVAL = 25   # OKX memutus koneksi jika 30 detik tanpa pesan
+RECONNECT_DELAY = 3
+
+# ==================================================
+# STREAM STATE (CANDLE • TICKER • OPEN INTEREST)
+# ==================================================
+class OKXStream:
+    """
+    Backend streaming opsional untuk Context Gate.
+    Subscribe channel publik OKX (candle15m, tickers, open-interest)
+    dan simpan state rolling di memori dengan format yang sama
+    seperti REST (get_candles / get_ticker / get_oi_history).
+    """
+
+    def __init__(self, public_url=WS_PUBLIC_URL, business_url=WS_BUSINESS_URL,
+                 window=96, oi_periods=6, record_path=None):
+        self.public_url = public_url
+        self.business_url = business_url
+        self.window = window
+        self.oi_periods = oi_periods
+        self.record_path = record_path
+
+        self._insts = set()
+        self._candles = {}    # inst -> {ts: row}
+        self._stats = {}      # inst -> RollingCandleStats (range & volume)
+        self._tickers = {}    # inst -> dict ticker
+        self._oi = {}         # inst -> deque[{"ts", "oi"}], terbaru di kiri
+        self._updated = {}    # inst -> epoch detik update terakhir
+
+        self._lock = threading.Lock()
+        self._sockets = {}
+        self._threads = []
+        self._stop = threading.Event()
+
+    # ---------- SUBSCRIPTION ----------
+    def _channels(self, url, insts):
+        # Satu URL untuk keduanya (stand-in lokal) → semua channel di satu socket
+        names = []
+        if url == self.public_url:
+            names += ["tickers", "open-interest"]
+        if url == self.business_url:
+            names.append(CANDLE_CHANNEL)
+        return [{"channel": n, "instId": i} for i in sorted(insts) for n in names]
+
+    def _subscribe(self, ws, url, insts):
+        args = self._channels(url, insts)
+        if args:
+            ws.send(json.dumps({"op": "subscribe", "args": args}))
+
+    def watch(self, insts):
+        """Tambah instrumen ke daftar subscribe (aman dipanggil berulang)."""
+        with self._lock:
+            new = set(insts) - self._insts
+            self._insts |= new
+            sockets = dict(self._sockets)
+
+        for url, ws in sockets.items():
+            try:
+                self._subscribe(ws, url, new)
+            except Exception:
+                pass  # akan subscribe ulang saat reconnect
+
+    # ---------- CONNECTION ----------
+    def start(self):
+        try:
+            import websocket
+        except ImportError as e:
+            raise RuntimeError("Mode streaming butuh paket `websocket-client`.") from e
+
+        urls = [self.public_url]
+        if self.business_url != self.public_url:
+            urls.append(self.business_url)
+
+        for url in urls:
+            t = threading.Thread(target=self._run, args=(websocket, url), daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self):
+        self._stop.set()
+        for ws in list(self._sockets.values()):
+            ws.close()
+
+    def _run(self, websocket, url):
+        while not self._stop.is_set():
+            def on_open(ws):
+                with self._lock:
+                    self._sockets[url] = ws
+                    insts = set(self._insts)
+                self._subscribe(ws, url, insts)
+                threading.Thread(target=self._keepalive, args=(ws,), daemon=True).start()
+
+            def on_close(ws, *_):
+                with self._lock:
+                    self._sockets.pop(url, None)
+
+            ws = websocket.WebSocketApp(
+                url,
+                on_open=on_open,
+                on_message=lambda ws, msg: self.handle_message(msg),
+                on_close=on_close
+            )
+            ws.run_forever()
+            time.sleep(RECONNECT_DELAY)
+
+    def _keepalive(self, ws):
+        while not self._stop.is_set() and ws.sock and ws.sock.connected:
+            time.sleep(PING_INTERVAL)
+            try:
+                ws.send("ping")
+            except Exception:
+                return
+
+    # ---------- MESSAGE HANDLING ----------
+    def handle_message(self, raw):
+        """Proses satu frame OKX (string JSON). Dipakai juga untuk replay."""
+        if raw == "pong":
+            return
+
+        if self.record_path:
+            with open(self.record_path, "a") as f:
+                f.write(raw.strip() + "\n")
+
+        msg = json.loads(raw)
+        arg = msg.get("arg")
+        data = msg.get("data")
+        if not arg or not data:
+            return  # event subscribe / error
+
+        channel = arg.get("channel")
+        inst = arg.get("instId")
+
+        with self._lock:
+            if channel == CANDLE_CHANNEL:
+                self._apply_candles(inst, data)
+            elif channel == "tickers":
+                self._tickers[inst] = data[-1]
+            elif channel == "open-interest":
+                for d in data:
+                    self._apply_oi(inst, d)
+            else:
+                return
+            self._updated[inst] = time.time()
+
+    def _apply_candles(self, inst, rows):
+        bars = self._candles.setdefault(inst, {})
+        stats = self._stats.setdefault(inst, RollingCandleStats(self.window))
+        for r in rows:
+            bars[int(r[0])] = list(r)
+            stats.update(r)
+        if len(bars) > self.window:
+            for ts in sorted(bars)[:len(bars) - self.window]:
+                del bars[ts]
+
+    def _apply_oi(self, inst, d):
+        # Satu sampel per periode 15m (nilai terakhir di periode tsb)
+        ts = int(d["ts"]) // BAR_MS * BAR_MS
+        hist = self._oi.setdefault(inst, deque(maxlen=self.oi_periods))
+        sample = {"ts": str(ts), "oi": d["oi"]}
+        if hist and hist[0]["ts"] == sample["ts"]:
+            hist[0] = sample
+        else:
+            hist.appendleft(sample)
+
+    # ---------- SEED FROM REST ----------
+    def seed_candles(self, inst, rows):
+        """Isi window awal dari REST / candle store sebelum stream berjalan."""
+        with self._lock:
+            self._apply_candles(inst, rows)
+
+    def seed_oi(self, inst, rows):
+        """Isi histori OI awal dari REST (terbaru dulu)."""
+        with self._lock:
+            for d in reversed(rows):
+                self._apply_oi(inst, d)
+
+    # ---------- READ (FORMAT SAMA DENGAN REST) ----------
+    def candles(self, inst, limit=96):
+        with self._lock:
+            bars = self._candles.get(inst, {})
+            return [bars[ts] for ts in sorted(bars, reverse=True)[:limit]]
+
+    def candle_stats(self, inst):
+        """Snapshot statistik rolling window (O(1), tanpa hitung ulang)."""
+        with self._lock:
+            stats = self._stats.get(inst)
+            return stats.snapshot() if stats else None
+
+    def ticker(self, inst):
+        with self._lock:
+            return self._tickers.get(inst)
+
+    def oi_history(self, inst):
+        with self._lock:
+            return list(self._oi.get(inst, []))
+
+    def last_update(self, inst):
+        with self._lock:
+            return self._updated.get(inst)
+
+# ==================================================
+# OFFLINE REPLAY
+# ==================================================
+def replay(stream, frames_path):
+    """Putar ulang frame rekaman (JSONL) langsung ke state, tanpa jaringan."""
+    with open(frames_path) as f:
+        for line in f:
+            if line.strip():
+                stream.handle_message(line)
+    return stream
+
+# ==================================================
+# SHARED INSTANCE
+# ==================================================
+_stream = None
+_stream_lock = threading.Lock()
+
+def get_stream():
+    """Stream bersama satu proses, otomatis start saat pertama dipakai."""
+    global _stream
+    with _stream_lock:
+        if _stream is None:
+            _stream = OKXStream()
+            _stream.start()
+        return _stream
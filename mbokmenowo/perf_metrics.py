@@ -0,0 +1,181 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# ==================================================
+# CONFIG
+# ==================================================
+METRICS_JSONL = "metrics.jsonl"
+METRICS_PROM = "metrics.prom"
+RECENT_SPANS = 500
+UNFLUSHED_MAX = 10000  # span terlama dibuang jika tidak ada yang flush
+
+_enabled = os.environ.get("PERF_METRICS") == "1"   # seluruh proses (env)
+_session = contextvars.ContextVar("perf_session", default=False)  # per sesi / thread
+_lock = threading.Lock()
+_agg = {}                                 # (name, labels) -> [count, total_ms, max_ms]
+_recent = deque(maxlen=RECENT_SPANS)      # span terbaru untuk panel
+_unflushed = deque(maxlen=UNFLUSHED_MAX)  # span belum ditulis ke JSONL
+
+def set_enabled(value):
+    """
+    Aktif / mati untuk konteks pemanggil saja (satu rerun sesi Streamlit),
+    bukan seluruh proses. PERF_METRICS=1 tetap mengaktifkan semuanya.
+    """
+    _session.set(bool(value))
+
+def is_enabled():
+    return _enabled or _session.get()
+
+def propagate(fn):
+    """
+    fn untuk thread pool: ikut status metrics pemanggil
+    (contextvar tidak terbawa ke thread worker).
+    """
+    if _enabled or not _session.get():
+        return fn
+
+    @functools.wraps(fn)
+    def inner(*args, **kwargs):
+        token = _session.set(True)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _session.reset(token)
+    return inner
+
+# ==================================================
+# SPAN
+# ==================================================
+class _NullSpan:
+    """Dipakai saat metrics mati: tanpa timer, tanpa lock."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def label(self, **labels):
+        pass
+
+_NULL = _NullSpan()
+
+class _Span:
+    __slots__ = ("name", "labels", "started")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def label(self, **labels):
+        self.labels.update(labels)
+
+    def __exit__(self, exc_type, *exc):
+        ms = (time.perf_counter() - self.started) * 1000
+        if exc_type is not None:
+            self.labels["error"] = exc_type.__name__
+        record(self.name, ms, self.labels)
+        return False
+
+def span(name, **labels):
+    """
+    Timer satu tahap:
+        with span("okx.request", endpoint=path) as s:
+            ...
+            s.label(status="ok")
+    """
+    if not (_enabled or _session.get()):
+        return _NULL
+    return _Span(name, labels)
+
+def timed(name):
+    """Decorator versi span()."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not (_enabled or _session.get()):
+                return fn(*args, **kwargs)
+            with _Span(name, {}):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+def record(name, ms, labels=None):
+    labels = labels or {}
+    key = (name, tuple(sorted(labels.items())))
+    event = {"ts": time.time(), "name": name, "ms": round(ms, 3), **labels}
+    with _lock:
+        agg = _agg.setdefault(key, [0, 0.0, 0.0])
+        agg[0] += 1
+        agg[1] += ms
+        agg[2] = max(agg[2], ms)
+        _recent.append(event)
+        _unflushed.append(event)
+
+# ==================================================
+# READ / EXPORT
+# ==================================================
+def summary():
+    """List dict agregat per (span, label) untuk panel."""
+    with _lock:
+        items = list(_agg.items())
+    return [
+        {
+            "span": name,
+            "labels": ", ".join(f"{k}={v}" for k, v in labels),
+            "count": c,
+            "avg_ms": total / c,
+            "max_ms": mx,
+            "total_ms": total
+        }
+        for (name, labels), (c, total, mx) in sorted(items, key=lambda kv: -kv[1][1])
+    ]
+
+def recent():
+    with _lock:
+        return list(_recent)
+
+def flush_jsonl(path=METRICS_JSONL):
+    """Append span yang belum ditulis (satu baris JSON per span)."""
+    with _lock:
+        events = list(_unflushed)
+        _unflushed.clear()
+    if events:
+        with open(path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(e, ensure_ascii=False) + "\n" for e in events)
+    return len(events)
+
+def prometheus_text():
+    lines = [
+        "# HELP app_span_duration_ms Durasi tahap (ms)",
+        "# TYPE app_span_duration_ms summary"
+    ]
+    with _lock:
+        items = list(_agg.items())
+    for (name, labels), (c, total, _) in items:
+        lbl = ",".join([f'span="{name}"', *(f'{k}="{v}"' for k, v in labels)])
+        lines.append(f"app_span_duration_ms_count{{{lbl}}} {c}")
+        lines.append(f"app_span_duration_ms_sum{{{lbl}}} {total:.3f}")
+    return "\n".join(lines) + "\n"
+
+def write_prometheus(path=METRICS_PROM):
+    """Tulis atomik (format textfile collector node_exporter)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
+
+def reset():
+    with _lock:
+        _agg.clear()
+        _recent.clear()
+        _unflushed.clear()
@@ -0,0 +1,264 @@
+"""
+Replay / backtest label Context Gate di data historis.
+
+    python -m mbokmenowo.replay_engine download BTC-USDT-SWAP ETH-USDT-SWAP --days 180
+    python -m mbokmenowo.replay_engine report
+    python -m mbokmenowo.replay_engine report --from-export   # jurnal dari mbokmenowo.columnar
+
+Dataset lokal (Parquet, satu file per instrumen):
+    history/candles/{inst}.parquet   ts, h, l, c, volQuote
+    history/oi/{inst}.parquet        ts, oi
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .context_engine import classify
+
+# ==================================================
+# CONFIG
+# ==================================================
+HISTORY_DIR = "history"
+WINDOW = 96          # sama dengan get_candles(limit=96)
+OI_PERIODS = 6       # sama dengan get_oi_history(limit=6)
+CHUNK_BARS = 20_000  # batas memori sliding window per chunk
+BAR_MS = 15 * 60_000
+
+LABEL_COLUMNS = ["rv_label", "rvol_label", "oi_label", "behavior", "verdict"]
+
+def _path(kind, inst):
+    return os.path.join(HISTORY_DIR, kind, f"{inst}.parquet")
+
+def dataset_instruments():
+    d = os.path.join(HISTORY_DIR, "candles")
+    if not os.path.isdir(d):
+        return []
+    return sorted(f[:-len(".parquet")] for f in os.listdir(d) if f.endswith(".parquet"))
+
+# ==================================================
+# DOWNLOAD (PAGING MUNDUR KE MASA LALU)
+# ==================================================
+def _page_back(client, path, params, ts_of, start_ms, cursor="after"):
+    rows, before = [], None
+    while True:
+        p = dict(params)
+        if before is not None:
+            p[cursor] = before
+        page = client.get_data(path, p)
+        if not page:
+            break
+        rows += page
+        oldest = ts_of(page[-1])
+        if oldest <= start_ms or (before is not None and oldest >= before):
+            break
+        before = oldest
+    return rows
+
+def download_history(client, inst, days):
+    """Ambil candle 15m & OI historis `days` hari terakhir, simpan Parquet."""
+    start_ms = int(time.time() * 1000) - days * 86_400_000
+
+    candles = _page_back(
+        client,
+        "/api/v5/market/history-candles",
+        {"instId": inst, "bar": "15m", "limit": 100},
+        lambda r: int(r[0]),
+        start_ms
+    )
+    df = pd.DataFrame(
+        [[int(r[0]), *map(float, (r[2], r[3], r[4], r[7]))] for r in candles if r[8] == "1"],
+        columns=["ts", "h", "l", "c", "volQuote"]
+    )
+    df = df[df["ts"] >= start_ms].drop_duplicates("ts").sort_values("ts")
+
+    oi = _page_back(
+        client,
+        "/api/v5/rubik/stat/contracts/open-interest-history",
+        {"instId": inst, "period": "15m", "limit": 100},
+        lambda r: int(r[0]),
+        start_ms,
+        cursor="end"
+    )
+    oi_df = pd.DataFrame(
+        [[int(r[0]), float(r[1])] for r in oi],
+        columns=["ts", "oi"]
+    ).drop_duplicates("ts").sort_values("ts")
+
+    for kind, data in (("candles", df), ("oi", oi_df)):
+        os.makedirs(os.path.join(HISTORY_DIR, kind), exist_ok=True)
+        data.to_parquet(_path(kind, inst), index=False)
+
+    return len(df), len(oi_df)
+
+# ==================================================
+# VECTORIZED SWEEP (LABEL DI SETIAP BAR)
+# ==================================================
+def sweep_labels(high, low, vol_quote, oi, window=WINDOW, oi_periods=OI_PERIODS,
+                 chunk=CHUNK_BARS):
+    """
+    Hitung label Context Gate di setiap bar t (window berakhir di t).
+    Bar < window-1 tidak punya window penuh → label None.
+
+    Pendekatan vol_24h: jumlah volQuote `window` bar terakhir
+    (ticker volCcy24h tidak tersedia historis).
+    """
+    n = len(high)
+    rng = high - low
+
+    # OI `oi_periods - 1` periode sebelumnya (histori[-1] versi live)
+    lag = oi_periods - 1
+    oi_prev = np.full(n, np.nan)
+    if lag < n:
+        oi_prev[lag:] = oi[:n - lag]
+
+    out = {k: np.full(n, None, dtype=object) for k in LABEL_COLUMNS}
+    out["rv_ratio"] = np.full(n, np.nan)
+    out["rvol_ratio"] = np.full(n, np.nan)
+
+    for start in range(window - 1, n, chunk):
+        stop = min(n, start + chunk)
+        seg_r = sliding_window_view(rng[start - window + 1:stop], window)
+        seg_v = sliding_window_view(vol_quote[start - window + 1:stop], window)
+
+        labels = classify(
+            seg_r.mean(axis=1),
+            np.median(seg_r, axis=1),
+            np.median(seg_v, axis=1),
+            np.full(stop - start, window),
+            seg_v.sum(axis=1),
+            oi[start:stop],
+            oi_prev[start:stop]
+        )
+        for k, v in labels.items():
+            out[k][start:stop] = v
+
+    return out
+
+def sweep_instrument(inst):
+    """Load dataset satu instrumen → DataFrame label per bar (kategori)."""
+    candles = pd.read_parquet(_path("candles", inst), columns=["ts", "h", "l", "volQuote"])
+    oi_path = _path("oi", inst)
+
+    if os.path.exists(oi_path):
+        oi_df = pd.read_parquet(oi_path, columns=["ts", "oi"])
+        candles = pd.merge_asof(candles, oi_df, on="ts", direction="backward")
+    else:
+        candles["oi"] = np.nan
+
+    labels = sweep_labels(
+        candles["h"].to_numpy(),
+        candles["l"].to_numpy(),
+        candles["volQuote"].to_numpy(),
+        candles["oi"].to_numpy()
+    )
+
+    df = pd.DataFrame({"ts": candles["ts"].to_numpy()})
+    for k in LABEL_COLUMNS:
+        df[k] = pd.Categorical(labels[k])
+    df["rv_ratio"] = labels["rv_ratio"]
+    df["rvol_ratio"] = labels["rvol_ratio"]
+    return df.dropna(subset=["behavior"])
+
+# ==================================================
+# JOIN KE JURNAL TRADE (result_r)
+# ==================================================
+def _trades_frame(trades):
+    df = pd.DataFrame(trades)
+    if df.empty or "result_r" not in df:
+        return pd.DataFrame(columns=["pair", "ts", "result_r"])
+    df["dt"] = pd.to_datetime(df["timestamp"], errors="coerce")
+    df = df.dropna(subset=["result_r", "dt"])
+    # timestamp jurnal = UTC naive → epoch ms (sama dengan ts candle OKX)
+    df["ts"] = (df["dt"] - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)
+    df["pair"] = df["pair"].astype(str).str.upper()
+    return df[["pair", "ts", "result_r"]].astype({"result_r": float}).sort_values("ts")
+
+def _instrument_result(args):
+    inst, trades = args
+    labels = sweep_instrument(inst)
+    bar_counts = labels["behavior"].value_counts()
+
+    base = inst.split("-")[0]
+    t = trades[trades["pair"] == base]
+    matched = pd.DataFrame()
+    if not t.empty and not labels.empty:
+        # Label bar yang sedang berjalan saat trade dicatat
+        matched = pd.merge_asof(
+            t, labels[["ts", "behavior", "verdict"]],
+            on="ts", direction="backward", tolerance=BAR_MS
+        ).dropna(subset=["behavior"])
+        matched["inst_id"] = inst
+
+    return bar_counts, matched
+
+def behavior_report(trades, insts=None, workers=None):
+    """
+    Expectancy per behavior: sweep semua instrumen (paralel per proses),
+    lalu gabungkan dengan result_r dari jurnal.
+    """
+    insts = insts or dataset_instruments()
+    trades = _trades_frame(trades)
+
+    bar_counts = pd.Series(dtype=float)
+    matched = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for counts, m in pool.map(_instrument_result, [(i, trades) for i in insts]):
+            bar_counts = bar_counts.add(counts, fill_value=0)
+            if not m.empty:
+                matched.append(m)
+
+    report = pd.DataFrame({"bars": bar_counts})
+    report["bar_share"] = report["bars"] / max(report["bars"].sum(), 1)
+
+    if matched:
+        m = pd.concat(matched, ignore_index=True)
+        m["behavior"] = m["behavior"].astype(str)
+        stats = m.groupby("behavior")["result_r"].agg(
+            trades="count",
+            win_rate=lambda r: (r > 0).mean(),
+            expectancy_r="mean",
+            total_r="sum"
+        )
+        report = report.join(stats, how="outer")
+
+    return report.sort_values("bars", ascending=False)
+
+# ==================================================
+# CLI
+# ==================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay label Context Gate")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_dl = sub.add_parser("download", help="ambil dataset historis dari OKX")
+    p_dl.add_argument("insts", nargs="+")
+    p_dl.add_argument("--days", type=int, default=90)
+
+    p_rep = sub.add_parser("report", help="expectancy per behavior")
+    p_rep.add_argument("--insts", nargs="*")
+    p_rep.add_argument("--workers", type=int)
+    p_rep.add_argument("--from-export", action="store_true",
+                       help="baca jurnal trade dari exports/ (Parquet) bukan journal.db / CSV")
+
+    args = parser.parse_args()
+
+    if args.command == "download":
+        from .okx_client import get_client
+        for inst in args.insts:
+            n_c, n_oi = download_history(get_client(), inst, args.days)
+            print(f"{inst}: {n_c} candle, {n_oi} OI")
+    else:
+        if args.from_export:
+            from .columnar import load
+            # DataFrame bertipe langsung (hanya 3 kolom yang dibaca)
+            trades = load("trades", columns=["timestamp", "pair", "result_r"])
+        else:
+            from .journal_store import TRADE_JOURNAL, open_journal
+            trades = open_journal(TRADE_JOURNAL).rows()
+        rep = behavior_report(trades, args.insts, args.workers)
+        print(rep.to_string())
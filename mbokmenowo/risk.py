@@ -0,0 +1,186 @@
+from decimal import Decimal
+
+import numpy as np
+
+# ==================================================
+# CONFIG
+# ==================================================
+# Perkiraan maintenance margin rate (tier terendah OKX SWAP);
+# liquidation price di sini hanya estimasi isolated margin.
+MAINT_MARGIN_RATE = 0.005
+
+# ==================================================
+# POSITION SIZING (RISK-FIRST)
+# ==================================================
+def size_position(equity, risk_percent, entry, sl, leverage):
+    """
+    Ukuran posisi dari risiko tetap per trade.
+    Return dict: risk_usd (1R), sl_dist, position_size (USD), margin, direction.
+    """
+    if entry == sl:
+        raise ValueError("Entry dan SL tidak boleh sama.")
+
+    risk_usd = equity * (risk_percent / 100)
+    sl_dist = abs(entry - sl)
+    position_size = (risk_usd * entry) / sl_dist
+
+    return {
+        "risk_usd": risk_usd,
+        "sl_dist": sl_dist,
+        "position_size": position_size,
+        "margin": position_size / leverage,
+        "direction": "LONG" if entry > sl else "SHORT"
+    }
+
+# ==================================================
+# OPEN TRADE MONITOR (VEKTOR SEMUA TRADE TERBUKA)
+# ==================================================
+def open_trade_metrics(entry, sl, is_long, position_size, margin, risk_percent, mark):
+    """
+    Metrik live untuk N trade terbuka dalam satu operasi array.
+    Semua input array (N,); mark NaN (harga tidak tersedia) → hasil NaN.
+    position_size = notional USD saat entry (lihat size_position).
+    """
+    sign = np.where(is_long, 1.0, -1.0)
+    sl_dist = np.abs(entry - sl)
+    qty = position_size / entry
+    move = (mark - entry) * sign
+
+    risk_usd = qty * sl_dist
+    equity = risk_usd / (risk_percent / 100)
+
+    return {
+        "unrealized_r": move / sl_dist,
+        "pnl_usd": qty * move,
+        "sl_distance_pct": (mark - sl) * sign / mark * 100,  # < 0 → SL terlewati
+        "margin_pct": margin / equity * 100,
+        "equity": equity
+    }
+
+# ==================================================
+# SCENARIO GRID (BROADCAST ENTRY × SL × RISK × LEVERAGE)
+# ==================================================
+def round_to_tick(price, tick_sz=None):
+    """Bulatkan harga ke kelipatan tickSz terdekat (tanpa sisa float)."""
+    price = np.asarray(price, dtype=np.float64)
+    if not tick_sz:
+        return price
+    decimals = max(0, -Decimal(str(tick_sz)).normalize().as_tuple().exponent)
+    return np.round(np.round(price / float(tick_sz)) * float(tick_sz), decimals)
+
+def _contracts(position_size, entry, ct_val, lot_sz, min_sz, inverse):
+    """
+    Notional USD → jumlah kontrak dibulatkan ke bawah (lotSz),
+    sehingga risiko aktual tidak melebihi target. Di bawah minSz → 0.
+    """
+    contract_usd = float(ct_val) if inverse else float(ct_val) * entry
+    lot = float(lot_sz or 1)
+    contracts = np.floor(position_size / contract_usd / lot + 1e-9) * lot
+    if min_sz:
+        # NaN (entry == SL) tetap NaN, bukan 0 kontrak
+        contracts = np.where(np.isnan(contracts) | (contracts >= float(min_sz)), contracts, 0.0)
+    return contracts, contracts * contract_usd
+
+def sizing_grid(equity, entries, sls, risk_percents, leverages,
+                ct_val=None, tick_sz=None, lot_sz=None, min_sz=None,
+                inverse=False, mmr=MAINT_MARGIN_RATE):
+    """
+    Sizing untuk semua kombinasi entry × SL × risk% × leverage sekaligus.
+    Harga dibulatkan ke tickSz; dengan ct_val, ukuran dibulatkan ke kontrak.
+    Return dict array berbentuk (E, S, R, L) + sumbu yang sudah dibulatkan.
+    Kombinasi entry == SL → NaN.
+    """
+    entries = round_to_tick(entries, tick_sz)
+    sls = round_to_tick(sls, tick_sz)
+
+    e = entries[:, None, None, None]
+    s = sls[None, :, None, None]
+    r = np.asarray(risk_percents, dtype=np.float64)[None, None, :, None]
+    lev = np.asarray(leverages, dtype=np.float64)[None, None, None, :]
+
+    # Kombinasi entry == SL → NaN tanpa warning
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sign = np.sign(e - s)  # +1 LONG, -1 SHORT, 0 tidak valid
+        sl_dist = np.where(sign != 0, np.abs(e - s), np.nan)
+        risk_target = equity * r / 100
+        position_size = risk_target * e / sl_dist
+
+        contracts = np.full_like(position_size, np.nan)
+        if ct_val:
+            contracts, position_size = _contracts(position_size, e, ct_val, lot_sz, min_sz, inverse)
+
+        liq = e * (1 - sign * (1 / lev - mmr))
+        margin = position_size / lev
+        risk_usd = position_size * sl_dist / e
+        liq_buffer = (s - liq) * sign / e * 100
+
+        # entry == SL: semua output NaN (bukan 0 yang terlihat valid)
+        contracts, position_size, margin, risk_usd, liq, liq_buffer = (
+            np.where(sign == 0, np.nan, a)
+            for a in (contracts, position_size, margin, risk_usd, liq, liq_buffer)
+        )
+
+    shape = np.broadcast_shapes(e.shape, s.shape, r.shape, lev.shape)
+
+    def full(a):
+        return np.broadcast_to(a, shape)
+
+    return {
+        "entries": entries,
+        "sls": sls,
+        "risk_percents": r.ravel(),
+        "leverages": lev.ravel(),
+        "is_long": full(sign > 0),
+        "contracts": full(contracts),
+        "position_size": full(position_size),
+        "margin": full(margin),
+        "risk_usd": full(risk_usd),
+        "liq_price": full(liq),
+        # > 0: SL kena sebelum likuidasi; <= 0: likuidasi duluan
+        "liq_buffer_pct": full(liq_buffer)
+    }
+
+# ==================================================
+# LADDER PLANNER (BEBERAPA FILL, SATU SL)
+# ==================================================
+def ladder_plan(equity, risk_percent, entries, sl, leverage, weights=None,
+                ct_val=None, tick_sz=None, lot_sz=None, min_sz=None, inverse=False):
+    """
+    Bagi risiko total ke beberapa entry (fill) sesuai bobot risiko.
+    Return (per_fill dict array, total dict). Semua entry harus di sisi SL yang sama.
+    """
+    entries = round_to_tick(entries, tick_sz)
+    sl = float(round_to_tick(sl, tick_sz))
+    sign = np.sign(entries - sl)
+    if not len(entries) or (sign == 0).any() or (sign != sign[0]).any():
+        raise ValueError("Semua entry harus di sisi yang sama terhadap SL.")
+
+    weights = np.ones(len(entries)) if weights is None else np.asarray(weights, dtype=np.float64)
+    risk_each = equity * risk_percent / 100 * weights / weights.sum()
+    sl_dist = np.abs(entries - sl)
+    position_size = risk_each * entries / sl_dist
+
+    contracts = np.full_like(position_size, np.nan)
+    if ct_val:
+        contracts, position_size = _contracts(position_size, entries, ct_val, lot_sz, min_sz, inverse)
+
+    qty = position_size / entries        # dalam koin
+    risk_usd = qty * sl_dist
+    total_qty = qty.sum()
+
+    per_fill = {
+        "entry": entries,
+        "contracts": contracts,
+        "position_size": position_size,
+        "margin": position_size / leverage,
+        "risk_usd": risk_usd
+    }
+    total = {
+        "direction": "LONG" if sign[0] > 0 else "SHORT",
+        "avg_entry": (qty * entries).sum() / total_qty if total_qty else np.nan,
+        "contracts": contracts.sum(),
+        "position_size": position_size.sum(),
+        "margin": position_size.sum() / leverage,
+        "risk_usd": risk_usd.sum()
+    }
+    return per_fill, total
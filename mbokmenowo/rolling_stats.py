@@ -0,0 +1,162 @@
+import heapq
+import math
+from collections import defaultdict
+
+# ==================================================
+# SLIDING MEDIAN (DUA HEAP + LAZY DELETION)
+# ==================================================
+class RollingMedian:
+    """
+    Median multiset dinamis: add / remove O(log n), median O(1).
+    Hasil sama persis dengan np.median (rata-rata dua nilai tengah
+    untuk jumlah genap).
+    """
+
+    def __init__(self):
+        self._lo = []            # max-heap (disimpan negatif)
+        self._hi = []            # min-heap
+        self._lo_size = 0
+        self._hi_size = 0
+        self._delayed = defaultdict(int)
+
+    def __len__(self):
+        return self._lo_size + self._hi_size
+
+    def _prune(self, heap, sign):
+        while heap:
+            x = sign * heap[0]
+            if not self._delayed.get(x):
+                return
+            self._delayed[x] -= 1
+            if not self._delayed[x]:
+                del self._delayed[x]
+            heapq.heappop(heap)
+
+    def _rebalance(self):
+        if self._lo_size > self._hi_size + 1:
+            heapq.heappush(self._hi, -heapq.heappop(self._lo))
+            self._lo_size -= 1
+            self._hi_size += 1
+        elif self._lo_size < self._hi_size:
+            heapq.heappush(self._lo, -heapq.heappop(self._hi))
+            self._lo_size += 1
+            self._hi_size -= 1
+        self._prune(self._lo, -1)
+        self._prune(self._hi, 1)
+
+    def add(self, x):
+        if not self._lo or x <= -self._lo[0]:
+            heapq.heappush(self._lo, -x)
+            self._lo_size += 1
+        else:
+            heapq.heappush(self._hi, x)
+            self._hi_size += 1
+        self._rebalance()
+
+    def remove(self, x):
+        # Nilai harus ada di multiset
+        self._delayed[x] += 1
+        if self._lo and x <= -self._lo[0]:
+            self._lo_size -= 1
+            self._prune(self._lo, -1)
+        else:
+            self._hi_size -= 1
+            self._prune(self._hi, 1)
+        self._rebalance()
+
+    def median(self):
+        n = len(self)
+        if not n:
+            return math.nan
+        if n % 2:
+            return float(-self._lo[0])
+        return (-self._lo[0] + self._hi[0]) / 2
+
+# ==================================================
+# RUNNING MEAN (NEUMAIER COMPENSATED SUM)
+# ==================================================
+class RunningMean:
+    """Sum terkompensasi: tanpa drift walau jutaan add/remove."""
+
+    def __init__(self):
+        self.n = 0
+        self._sum = 0.0
+        self._comp = 0.0
+
+    def _acc(self, x):
+        t = self._sum + x
+        if abs(self._sum) >= abs(x):
+            self._comp += (self._sum - t) + x
+        else:
+            self._comp += (x - t) + self._sum
+        self._sum = t
+
+    def add(self, x):
+        self.n += 1
+        self._acc(x)
+
+    def remove(self, x):
+        self.n -= 1
+        self._acc(-x)
+
+    def mean(self):
+        return (self._sum + self._comp) / self.n if self.n else math.nan
+
+# ==================================================
+# ROLLING CANDLE STATS (RANGE & VOLUME PER INSTRUMEN)
+# ==================================================
+class RollingCandleStats:
+    """
+    Window `window` bar terakhir, diperbarui per candle:
+    - bar baru → masuk, bar tertua keluar
+    - bar berjalan (ts sama) → nilai lama diganti
+    Menyediakan median/mean range dan median volQuote
+    yang dipakai blok RELATIVE VOLATILITY & RELATIVE VOLUME.
+    """
+
+    def __init__(self, window=96):
+        self.window = window
+        self._bars = {}           # ts -> (range, volQuote)
+        self._ts_heap = []        # ts tertua di atas
+        self.range_median = RollingMedian()
+        self.range_mean = RunningMean()
+        self.vol_median = RollingMedian()
+
+    def __len__(self):
+        return len(self._bars)
+
+    def _drop(self, ts):
+        rng, vol = self._bars.pop(ts)
+        self.range_median.remove(rng)
+        self.range_mean.remove(rng)
+        self.vol_median.remove(vol)
+
+    def update(self, row):
+        """row = candle OKX mentah [ts, o, h, l, c, vol, volCcy, volQuote, confirm]."""
+        ts = int(row[0])
+        rng = float(row[2]) - float(row[3])
+        vol = float(row[7])
+
+        if ts in self._bars:
+            self._drop(ts)
+        else:
+            if len(self._bars) >= self.window and ts < self._ts_heap[0]:
+                return  # lebih tua dari window
+            heapq.heappush(self._ts_heap, ts)
+
+        self._bars[ts] = (rng, vol)
+        self.range_median.add(rng)
+        self.range_mean.add(rng)
+        self.vol_median.add(vol)
+
+        while len(self._bars) > self.window:
+            self._drop(heapq.heappop(self._ts_heap))
+
+    def snapshot(self):
+        """Statistik window saat ini (input context_engine.classify)."""
+        return {
+            "avg_range": self.range_mean.mean(),
+            "median_range": self.range_median.median(),
+            "median_vol": self.vol_median.median(),
+            "bar_count": len(self._bars)
+        }
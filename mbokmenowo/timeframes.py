@@ -0,0 +1,103 @@
+import numpy as np
+
+from .candle_store import BAR_MS, backfill_candles, resample_candles, sync_candles
+from .context_engine import compute_labels, stack_candles, stack_oi, stack_tickers
+from .perf_metrics import span
+
+# ==================================================
+# CONFIG
+# ==================================================
+MTF_BARS = ["5m", "15m", "1H", "4H"]
+BASE_BAR = "15m"        # bar yang sudah di-sync pipeline utama
+WINDOW = 96             # sama dengan get_candles(limit=96)
+OI_PERIODS = 6          # sama dengan get_oi_history(limit=6)
+OI_BASE_PERIOD = "15m"
+OI_BASE_LIMIT = 96      # 96 × 15m cukup untuk OI 15m, 1H & 4H (6 periode)
+DAY_MS = 24 * 60 * 60_000
+
+# ==================================================
+# CANDLE PER TIMEFRAME (RESAMPLE DULU, FETCH JIKA PERLU)
+# ==================================================
+def _derive(client, store, inst, bar, fresh, limit):
+    """
+    Resample dari bar tersimpan yang baru di-sync (paling kasar dulu).
+    Histori sumber yang kurang di-backfill sekali (mis. 1H butuh 388 × 15m,
+    sync biasa hanya 96); sumber yang butuh > RECENT_MAX_BARS dilewati.
+    """
+    sources = sorted(
+        (b for b in fresh if BAR_MS[b] < BAR_MS[bar] and BAR_MS[bar] % BAR_MS[b] == 0),
+        key=lambda b: -BAR_MS[b]
+    )
+    for src in sources:
+        ratio = BAR_MS[bar] // BAR_MS[src]
+        need = (limit + 1) * ratio
+        if not backfill_candles(client, store, inst, src, need):
+            continue
+        rows = store.window(inst, src, need)
+        derived = resample_candles(rows, src, bar, limit)
+        if derived is not None:
+            return derived, src
+    return None, None
+
+def timeframe_candles(client, store, inst, bars=MTF_BARS, limit=WINDOW):
+    """
+    Candle `limit` bar untuk setiap timeframe.
+    - BASE_BAR: dibaca dari store (sudah di-sync pipeline utama)
+    - Lebih besar: resample bar tersimpan yang segar (histori di-backfill sekali)
+    - Sisanya (mis. 5m, atau histori belum cukup): sync incremental
+    Return dict bar → (rows, sumber) dengan sumber "store" / "resample <bar>" / "fetch".
+    """
+    out = {}
+    fresh = {BASE_BAR}
+
+    for bar in sorted(bars, key=BAR_MS.get):
+        with span("mtf.candles", bar=bar) as s:
+            if bar == BASE_BAR:
+                out[bar] = (store.window(inst, bar, limit), "store")
+            else:
+                rows, src = _derive(client, store, inst, bar, fresh, limit)
+                if rows is not None:
+                    out[bar] = (rows, f"resample {src}")
+                else:
+                    out[bar] = (sync_candles(client, store, inst, bar, limit), "fetch")
+                    fresh.add(bar)
+            s.label(source=out[bar][1].split()[0])
+
+    return out
+
+# ==================================================
+# OI PER TIMEFRAME
+# ==================================================
+def derive_oi(base_hist, bar, periods=OI_PERIODS):
+    """
+    OI `periods` periode timeframe `bar` dari histori OI OI_BASE_PERIOD
+    (terbaru dulu): ambil tiap titik ke-k. None jika histori kurang.
+    """
+    step = BAR_MS[bar] // BAR_MS[OI_BASE_PERIOD]
+    if BAR_MS[bar] % BAR_MS[OI_BASE_PERIOD] or len(base_hist) < (periods - 1) * step + 1:
+        return None
+    return base_hist[:(periods - 1) * step + 1:step]
+
+# ==================================================
+# LABELS SEMUA TIMEFRAME (SATU PASS VEKTOR)
+# ==================================================
+def evaluate_timeframes(candles_by_bar, ticker, oi_by_bar):
+    """
+    candles_by_bar / oi_by_bar: dict bar → payload OKX.
+    Semua timeframe dihitung sebagai satu batch (baris = timeframe).
+    Return dict bar → dict label (sama dengan evaluate_batch).
+    """
+    bars = list(candles_by_bar)
+    high, low, vol_quote = stack_candles([candles_by_bar[b] for b in bars])
+    oi_first, oi_last = stack_oi([oi_by_bar.get(b) or [] for b in bars])
+    labels = compute_labels(
+        high, low, vol_quote,
+        np.repeat(stack_tickers([ticker]), len(bars)),
+        oi_first, oi_last,
+        day_bars=np.array([DAY_MS // BAR_MS[b] for b in bars], dtype=np.float64)
+    )
+
+    return {
+        bar: {k: v[i].item() for k, v in labels.items()}
+        for i, bar in enumerate(bars)
+    }
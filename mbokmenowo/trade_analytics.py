@@ -0,0 +1,84 @@
+import math
+
+# ==================================================
+# RUNNING AGGREGATE (SATU GRUP)
+# ==================================================
+class RunningR:
+    """Akumulasi result R: jumlah trade, win, total R. Update O(1)."""
+
+    __slots__ = ("trades", "wins", "total_r")
+
+    def __init__(self):
+        self.trades = 0
+        self.wins = 0
+        self.total_r = 0.0
+
+    def add(self, r):
+        self.trades += 1
+        self.wins += r > 0
+        self.total_r += r
+
+    def summary(self):
+        return {
+            "trades": self.trades,
+            "win_rate": self.wins / self.trades if self.trades else 0.0,
+            "expectancy_r": self.total_r / self.trades if self.trades else 0.0,
+            "total_r": self.total_r
+        }
+
+# ==================================================
+# TRADE ANALYTICS (INCREMENTAL)
+# ==================================================
+BREAKDOWN_KEYS = ["pair", "pair_source", "bias_score"]
+
+class TradeAnalytics:
+    """
+    Statistik jurnal yang di-update per result_r tersimpan:
+    win rate, expectancy (R), equity curve R & max drawdown,
+    plus breakdown per pair / pair_source / bias_score.
+    Dibangun sekali dari jurnal, lalu add_result() O(1).
+    """
+
+    def __init__(self, trades=()):
+        self.total = RunningR()
+        self.groups = {k: {} for k in BREAKDOWN_KEYS}
+        self.equity_r = 0.0
+        self.peak_r = 0.0
+        self.max_drawdown_r = 0.0
+        self._seen = set()
+
+        for t in trades:
+            self.add_result(t)
+
+    def add_result(self, trade):
+        r = trade.get("result_r")
+        if r is None or (isinstance(r, float) and math.isnan(r)):
+            return
+        if trade.get("id") in self._seen:
+            return  # result sudah dihitung
+        self._seen.add(trade.get("id"))
+
+        r = float(r)
+        self.total.add(r)
+        for k in BREAKDOWN_KEYS:
+            self.groups[k].setdefault(trade.get(k), RunningR()).add(r)
+
+        # Equity curve dalam R (urutan result disimpan)
+        self.equity_r += r
+        self.peak_r = max(self.peak_r, self.equity_r)
+        self.max_drawdown_r = max(self.max_drawdown_r, self.peak_r - self.equity_r)
+
+    def summary(self):
+        return {
+            **self.total.summary(),
+            "equity_r": self.equity_r,
+            "max_drawdown_r": self.max_drawdown_r,
+            "drawdown_r": self.peak_r - self.equity_r
+        }
+
+    def breakdown(self, key):
+        """List dict per grup (untuk ditampilkan sebagai tabel kecil)."""
+        return [
+            {key: g, **agg.summary()}
+            for g, agg in sorted(self.groups[key].items(), key=lambda kv: -kv[1].trades)
+        ]
@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta
+
+# ==================================================
+# CONFIG
+# ==================================================
+WIB_OFFSET = timedelta(hours=7)
+WIB_FORMAT = "%Y-%m-%d %H:%M"  # format datetime_wib di jurnal
+
+# ==================================================
+# WAKTU WIB (TANPA PYTZ)
+# ==================================================
+def wib_now():
+    # Gunakan WIB (UTC+7) secara konsisten
+    return datetime.utcnow() + WIB_OFFSET
+
+def wib_since(hours):
+    """Batas bawah `hours` terakhir, dalam format datetime_wib jurnal."""
+    return (wib_now() - timedelta(hours=hours)).strftime(WIB_FORMAT)
+
+def trading_session(hour):
+    """Session pasar berdasarkan jam WIB."""
+    if 7 <= hour < 14:
+        return "Asia"
+    if 14 <= hour < 19:
+        return "London"
+    if 19 <= hour < 23:
+        return "New York"
+    return "Off-hours"
@@ -1,14 +1,23 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta, date
-import os
-from streamlit_autorefresh import st_autorefresh
+import numpy as np
+from datetime import datetime
+
+from mbokmenowo.journal_service import get_journal_service
+from mbokmenowo.journal_store import CONTEXT_JOURNAL, TRADE_JOURNAL, open_journal
+from mbokmenowo.decision_feed import WATCH_HOURS, FeedWatcher, get_feed
+from mbokmenowo.instruments import get_instruments
+from mbokmenowo.journal_backup import JournalBackup
+from mbokmenowo.market import mark_prices, trade_inst
+from mbokmenowo.market_cache import get_market_cache
+from mbokmenowo.okx_client import get_client
+from mbokmenowo.risk import ladder_plan, open_trade_metrics, size_position, sizing_grid
+from mbokmenowo.trade_analytics import TradeAnalytics
+from mbokmenowo.wib import wib_since
 
 # ==================================================
 # FILE PATH
 # ==================================================
-JOURNAL_FILE = "journal.csv"
-CONTEXT_JOURNAL_FILE = "context_gate_journal.csv"
 BACKUP_DIR = "backups"
 
 # ==================================================
@@ -24,95 +33,183 @@ st.title("📊 Scalping Risk Manager")
 st.caption("Risk-first • Bias-first • Context-aware • Futures")
 
 # ==================================================
-# SESSION STATE
+# JOURNAL STORAGE (SATU WRITER, VIEW BERSAMA)
 # ==================================================
-today = date.today().isoformat()
+# Semua sesi / tab memakai satu service: write diantre ke satu thread
+# writer, baris dibaca dari view bersama (tanpa salinan per sesi).
+trade_journal = get_journal_service(TRADE_JOURNAL)
 
-if "journal" not in st.session_state:
-    st.session_state.journal = []
+@st.cache_resource
+def get_context_journal():
+    return open_journal(CONTEXT_JOURNAL)  # hanya dibaca
 
-# ==================================================
-# LOAD JOURNAL
-# ==================================================
-if os.path.exists(JOURNAL_FILE) and not st.session_state.journal:
-    st.session_state.journal = pd.read_csv(JOURNAL_FILE).to_dict("records")
+context_journal = get_context_journal()
 
 # ==================================================
 # SAVE & BACKUP
 # ==================================================
-def save_journal():
-    pd.DataFrame(st.session_state.journal).to_csv(JOURNAL_FILE, index=False)
+@st.cache_resource
+def get_backup():
+    backup = JournalBackup("journal", BACKUP_DIR)
+    # Dipanggil thread writer setelah commit → backup ikut berurutan
+    trade_journal.add_listener(
+        lambda op, row_id, fields: backup.save(op, row_id, fields, trade_journal.rows()),
+        key="backup"
+    )
+    return backup
+
+backup = get_backup()
+
+@st.cache_resource
+def get_analytics():
+    # Dibangun sekali dari jurnal; selanjutnya update O(1) per result
+    analytics = TradeAnalytics(trade_journal.rows())
+
+    def on_commit(op, row_id, fields):
+        if "result_r" in fields:
+            analytics.add_result(trade_journal.get(row_id))
 
-def backup_journal():
-    if not os.path.exists(BACKUP_DIR):
-        os.makedirs(BACKUP_DIR)
-    path = f"{BACKUP_DIR}/journal_{today}.csv"
-    if not os.path.exists(path):
-        pd.DataFrame(st.session_state.journal).to_csv(path, index=False)
+    trade_journal.add_listener(on_commit, key="analytics")
+    return analytics
+
+analytics = get_analytics()
+
+def add_trade(trade):
+    # Menunggu commit batch writer; backup & analytics lewat listener
+    return trade_journal.append(trade)
+
+def update_trade(trade, **fields):
+    # Update satu baris saja (SQLite UPDATE by id); view bersama diganti writer
+    trade_journal.update(trade["id"], fields)
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def _trade_index(version, _rows):
+    return {
+        "open": [i for i, t in enumerate(_rows) if t["trade_status"] == "OPEN"],
+        "pending": [
+            i for i, t in enumerate(_rows)
+            if t["trade_status"] == "CLOSED" and t["result_r"] is None
+        ]
+    }
+
+def trade_index():
+    """
+    (rows, posisi trade OPEN & CLOSED-tanpa-R) dari view jurnal bersama.
+    Index dihitung ulang hanya saat jurnal berubah, bukan setiap rerun widget.
+    """
+    version, rows = trade_journal.snapshot()
+    return rows, _trade_index(version, rows)
 
 # ==================================================
-# CONTEXT GATE INTEGRATION (TIMEZONE SAFE)
+# CONTEXT GATE INTEGRATION (PUSH, TIMEZONE SAFE)
 # ==================================================
-def get_context_gate_pairs(max_hours=4, limit=5):
+CONTEXT_MAX_HOURS = 4
+
+@st.cache_resource
+def get_feed_watcher():
+    """
+    Pair TAKEN dari Context Gate, disimpan di memori proses.
+    Jurnal lama dibaca sekali untuk isi awal; selanjutnya hanya
+    event baru dari decision feed (thread watcher).
+    """
+    watcher = FeedWatcher(get_feed())
+    watcher.seed(context_journal.recent_latest(
+        "pair", "datetime_wib", wib_since(WATCH_HOURS), decision="TAKEN"
+    ))
+    watcher.start()
+    return watcher
+
+feed_watcher = get_feed_watcher()
+
+def get_context_gate_pairs(max_hours=CONTEXT_MAX_HOURS, limit=5):
     """
     Ambil pair TAKEN dari Context Gate
     - Timezone: WIB
     - Filter waktu: max_hours terakhir
-    - Anti regresi schema
+    - Dari memori (tanpa baca file setiap rerun)
     """
-    if not os.path.exists(CONTEXT_JOURNAL_FILE):
-        return []
+    return feed_watcher.recent_pairs(max_hours, limit)
 
-    df = pd.read_csv(CONTEXT_JOURNAL_FILE)
-
-    REQUIRED_COLS = {"pair", "decision", "datetime_wib"}
-    if not REQUIRED_COLS.issubset(df.columns):
-        st.warning("⚠️ Schema Context Gate tidak cocok.")
-        return []
-
-    df = df[df["decision"] == "TAKEN"]
-    if df.empty:
-        return []
-
-    # Parse datetime_wib secara eksplisit
-    df["datetime_wib"] = pd.to_datetime(
-        df["datetime_wib"],
-        format="%Y-%m-%d %H:%M",
-        errors="coerce"
-    )
+# ==================================================
+# LIVE MARK PRICE (SATU REQUEST UNTUK SEMUA TRADE)
+# ==================================================
+MONITOR_REFRESH_S = 5
 
-    df = df.dropna(subset=["datetime_wib"])
-    if df.empty:
-        return []
+okx = get_client()
 
-    # Gunakan WIB (UTC+7) secara konsisten
-    now_wib = datetime.utcnow() + timedelta(hours=7)
+# Index dari disk langsung dipakai; refresh harian berjalan di background
+# (OKX lambat / down tidak menahan halaman)
+instruments = get_instruments()
+if instruments.is_stale():
+    get_market_cache().refresh(("instruments", "SWAP"), lambda: instruments.refresh(okx))
 
-    df["age_hours"] = (
-        now_wib - df["datetime_wib"]
-    ).dt.total_seconds() / 3600
+@st.cache_data(ttl=MONITOR_REFRESH_S - 1, show_spinner=False)
+def get_mark_prices():
+    # Dibagi semua session: maksimal satu request per refresh
+    return mark_prices(okx)
 
-    df = df[df["age_hours"] <= max_hours]
-    if df.empty:
-        return []
+def live_metrics(trades):
+    """Metrik live seluruh trade terbuka (satu operasi array)."""
+    marks = get_mark_prices()
 
-    # Urutkan terbaru & ambil pair unik
-    df = df.sort_values("datetime_wib", ascending=False)
+    def col(key):
+        return np.array(
+            [np.nan if t.get(key) is None else float(t[key]) for t in trades],
+            dtype=np.float64
+        )
 
-    pairs = []
-    for p in df["pair"]:
-        if p not in pairs:
-            pairs.append(p)
-        if len(pairs) >= limit:
-            break
+    mark = np.array(
+        [marks.get(trade_inst(t["pair"], instruments), np.nan) for t in trades],
+        dtype=np.float64
+    )
+    return mark, open_trade_metrics(
+        col("entry"),
+        col("sl"),
+        np.array([t["direction"] == "LONG" for t in trades]),
+        col("position_size"),
+        col("margin"),
+        col("risk_percent"),
+        mark
+    )
 
-    return pairs
+# ==================================================
+# SCENARIO SIZING (GRID & LADDER)
+# ==================================================
+def parse_numbers(text):
+    """'100, 99.5 99' → [100.0, 99.5, 99.0]; entri tidak valid diabaikan."""
+    out = []
+    for part in text.replace(",", " ").split():
+        try:
+            out.append(float(part))
+        except ValueError:
+            pass
+    return out
+
+def contract_spec(pair):
+    """ctVal / tickSz / lotSz / minSz dari index instrumen (kosong jika tidak dikenal)."""
+    inst = trade_inst(pair, instruments)
+    meta = instruments.meta(inst) if inst else None
+    if not meta:
+        return {}
+    return {
+        "ct_val": meta["ctVal"],
+        "tick_sz": meta["tickSz"],
+        "lot_sz": meta["lotSz"],
+        "min_sz": meta["minSz"],
+        "inverse": meta["ctValCcy"] == "USD"
+    }
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def cached_grid(equity, entries, sls, risk_percents, leverages, spec_items):
+    # Dihitung sekali per kombinasi input; pilih risk/leverage hanya slicing
+    return sizing_grid(equity, entries, sls, risk_percents, leverages, **dict(spec_items))
 
 # ==================================================
 # CONSTANTS
 # ==================================================
 PIN_CODE = "1234"
 R_OPTIONS = [-1.0, -0.5, 0.0, 0.5, 1.0, 1.5, 2.0]
+JOURNAL_PAGE_SIZE = 25
 
 # ==================================================
 # MODE
@@ -138,7 +235,7 @@ if mode == "📱 Quick Trade (Eksekusi)":
     # ---------- STEP 1: PAIR SELECTION ----------
     st.markdown("### 🧩 Pilih Pair")
 
-    context_pairs = get_context_gate_pairs(max_hours=4, limit=5)
+    context_pairs = get_context_gate_pairs(max_hours=CONTEXT_MAX_HOURS, limit=5)
 
     use_context = False
 
@@ -221,11 +318,11 @@ if mode == "📱 Quick Trade (Eksekusi)":
         st.stop()
 
     # ---------- STEP 4: RISK OUTPUT ----------
-    risk_usd = equity * (risk_percent / 100)
-    sl_dist = abs(entry - sl)
-    position_size = (risk_usd * entry) / sl_dist
-    margin = position_size / leverage
-    direction = "LONG" if entry > sl else "SHORT"
+    sizing = size_position(equity, risk_percent, entry, sl, leverage)
+    risk_usd = sizing["risk_usd"]
+    position_size = sizing["position_size"]
+    margin = sizing["margin"]
+    direction = sizing["direction"]
 
     st.subheader("📊 Ringkasan Risiko")
     st.markdown(f"""
@@ -236,11 +333,81 @@ if mode == "📱 Quick Trade (Eksekusi)":
 **1R** : ${risk_usd:,.2f}  
 **Position Size** : ${position_size:,.2f}  
 **Margin Digunakan** : **${margin:,.2f}**
+""")
+
+    spec = contract_spec(pair)
+    if spec:
+        st.caption(
+            f"Kontrak {trade_inst(pair, instruments)} • ctVal {spec['ct_val']} • "
+            f"tickSz {spec['tick_sz']} • lotSz {spec['lot_sz']}"
+        )
+
+    # ---------- STEP 4B: SKENARIO (OPSIONAL) ----------
+    with st.expander("🧮 Skenario Sizing (Entry × SL × Risk × Leverage)", expanded=False):
+        # Kosong = pakai input di atas (+ beberapa variasi umum)
+        default_risks = sorted({0.5, risk_percent, 2.0})
+        default_levs = sorted({3, leverage, 10, 20})
+        g_entries = parse_numbers(st.text_input(
+            "Entry (pisahkan spasi/koma)", placeholder=f"{entry:g}")) or [entry]
+        g_sls = parse_numbers(st.text_input("SL", placeholder=f"{sl:g}")) or [sl]
+        g_risks = parse_numbers(st.text_input(
+            "Risk %", placeholder=" ".join(f"{r:g}" for r in default_risks))) or default_risks
+        g_levs = parse_numbers(st.text_input(
+            "Leverage", placeholder=" ".join(f"{v:g}" for v in default_levs))) or default_levs
+
+        grid = cached_grid(
+            equity, tuple(g_entries), tuple(g_sls), tuple(g_risks), tuple(g_levs),
+            tuple(sorted(spec.items()))
+        )
+        st.caption(f"{grid['margin'].size:,} kombinasi")
+
+        r_sel = st.selectbox("Risk %", range(len(grid["risk_percents"])),
+                             format_func=lambda i: f"{grid['risk_percents'][i]:g}%")
+        l_sel = st.selectbox("Leverage", range(len(grid["leverages"])),
+                             format_func=lambda i: f"{grid['leverages'][i]:g}x")
+
+        def pivot(key, fmt):
+            return pd.DataFrame(
+                grid[key][:, :, r_sel, l_sel],
+                index=[f"E {e:g}" for e in grid["entries"]],
+                columns=[f"SL {v:g}" for v in grid["sls"]]
+            ).map(lambda v: "–" if np.isnan(v) else fmt.format(v))
+
+        tab_margin, tab_size, tab_liq = st.tabs(["Margin", "Ukuran", "Buffer Likuidasi"])
+        tab_margin.dataframe(pivot("margin", "${:,.2f}"), use_container_width=True)
+        tab_size.dataframe(
+            pivot("contracts", "{:g} kontrak") if spec else pivot("position_size", "${:,.0f}"),
+            use_container_width=True
+        )
+        tab_liq.dataframe(pivot("liq_buffer_pct", "{:+.2f}%"), use_container_width=True)
+        tab_liq.caption("Jarak SL ke estimasi harga likuidasi (isolated). ≤ 0% = likuidasi sebelum SL.")
+
+    with st.expander("🪜 Ladder Entry (beberapa fill, satu SL)", expanded=False):
+        fills = parse_numbers(st.text_input(
+            "Harga fill", placeholder="contoh: 100 99.5 99", key="ladder_fills"))
+        weights = parse_numbers(st.text_input("Bobot risiko (opsional)", "", key="ladder_weights"))
+        if fills:
+            try:
+                per_fill, total = ladder_plan(
+                    equity, risk_percent, fills, sl, leverage,
+                    weights=weights if len(weights) == len(fills) else None,
+                    **spec
+                )
+            except ValueError as e:
+                st.warning(str(e))
+            else:
+                st.dataframe(pd.DataFrame(per_fill).round(4), use_container_width=True, hide_index=True)
+                if not total["position_size"]:
+                    st.warning("Ukuran tiap fill di bawah lot minimum kontrak.")
+                else:
+                    st.markdown(f"""
+**Arah** : {total['direction']} • **Avg Entry** : {total['avg_entry']:,.6g}  
+**Risk Total** : ${total['risk_usd']:,.2f} • **Margin Total** : ${total['margin']:,.2f}
 """)
 
     # ---------- STEP 5: SAVE TRADE ----------
     if st.button("💾 Catat Trade & Eksekusi", use_container_width=True):
-        st.session_state.journal.append({
+        add_trade({
             "timestamp": datetime.utcnow().isoformat(),
             "pair": pair,
             "pair_source": "CONTEXT_GATE" if use_context else "MANUAL",
@@ -255,72 +422,127 @@ if mode == "📱 Quick Trade (Eksekusi)":
             "result_r": None,
             "exit_reason": None
         })
-        save_journal()
-        backup_journal()
         st.success("Trade dicatat. Lanjut eksekusi di exchange.")
 
 # ==================================================
 # NORMAL MODE (UNCHANGED)
 # ==================================================
 else:
-    st_autorefresh(interval=60 * 1000, key="monitor_timer")
-
-    st.subheader("🟢 Trade Aktif")
-
-    open_trades = [
-        (i, t) for i, t in enumerate(st.session_state.journal)
-        if t["trade_status"] == "OPEN"
-    ]
+    @st.fragment(run_every=MONITOR_REFRESH_S)
+    def open_trade_monitor():
+        """Refresh beberapa detik sekali hanya me-rerun panel ini."""
+        st.subheader("🟢 Trade Aktif")
+
+        journal_rows, index = trade_index()
+        open_trades = index["open"]
+
+        if not open_trades:
+            st.info("Tidak ada trade aktif.")
+            return
+
+        trades = [journal_rows[i] for i in open_trades]
+        mark, live = live_metrics(trades)
+
+        newest_equity = live["equity"][-1]
+        total_margin = sum(t["margin"] or 0.0 for t in trades)
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Unrealized", f"{np.nansum(live['unrealized_r']):+.2f}R")
+        m2.metric("PnL", f"${np.nansum(live['pnl_usd']):+,.2f}")
+        m3.metric(
+            "Margin Terpakai",
+            f"${total_margin:,.0f}",
+            f"{total_margin / newest_equity:.0%} equity" if newest_equity > 0 else None,
+            delta_color="off"
+        )
 
-    if not open_trades:
-        st.info("Tidak ada trade aktif.")
-    else:
-        for idx, trade in open_trades:
+        for k, (idx, trade) in enumerate(zip(open_trades, trades)):
             elapsed = int(
                 (datetime.utcnow() - datetime.fromisoformat(trade["timestamp"]))
                 .total_seconds() / 60
             )
+            r_now = live["unrealized_r"][k]
+            r_text = "–" if np.isnan(r_now) else f"{r_now:+.2f}R"
+            margin_pct = live["margin_pct"][k]
+            margin_text = "" if np.isnan(margin_pct) else f" ({margin_pct:.1f}% equity)"
 
             with st.expander(
-                f"{trade['pair']} • {trade['direction']} • {elapsed} menit",
+                f"{trade['pair']} • {trade['direction']} • {elapsed} menit • {r_text}",
                 expanded=True
             ):
+                if np.isnan(mark[k]):
+                    st.caption("Mark price tidak tersedia untuk pair ini.")
                 st.markdown(f"""
 **Entry** : {trade['entry']}  
 **SL** : {trade['sl']}  
-**Margin** : ${trade['margin']:,.2f}
+**Mark** : {"–" if np.isnan(mark[k]) else f"{mark[k]:,.6g}"}  
+**Jarak ke SL** : {"–" if np.isnan(mark[k]) else f"{live['sl_distance_pct'][k]:.2f}%"}  
+**PnL** : {"–" if np.isnan(mark[k]) else f"${live['pnl_usd'][k]:+,.2f}"}  
+**Margin** : ${trade['margin']:,.2f}{margin_text}
 """)
 
                 if st.button("⛔ Selesai Trade", key=f"close_{idx}"):
-                    trade["trade_status"] = "CLOSED"
-                    save_journal()
-                    backup_journal()
-                    st.success("Trade ditandai selesai.")
+                    update_trade(trade, trade_status="CLOSED")
+                    st.toast("Trade ditandai selesai.")
+                    # Daftar "Update Result R" di luar fragment ikut berubah
+                    st.rerun()
+
+    open_trade_monitor()
 
     st.divider()
     st.subheader("✏️ Update Result R")
 
-    pending = [
-        i for i, t in enumerate(st.session_state.journal)
-        if t["trade_status"] == "CLOSED" and t["result_r"] is None
-    ]
+    journal_rows, index = trade_index()
+    pending = index["pending"]
 
     if pending:
         idx = st.selectbox(
             "Pilih Trade",
             pending,
-            format_func=lambda i: f"{st.session_state.journal[i]['pair']} @ {st.session_state.journal[i]['timestamp']}"
+            format_func=lambda i: f"{journal_rows[i]['pair']} @ {journal_rows[i]['timestamp']}"
         )
         r_val = st.selectbox("Result R", R_OPTIONS)
         reason = st.text_input("Alasan Exit")
 
         if st.button("💾 Simpan Result"):
-            st.session_state.journal[idx]["result_r"] = r_val
-            st.session_state.journal[idx]["exit_reason"] = reason
-            save_journal()
-            backup_journal()
-            st.success("Result disimpan.")
+            update_trade(
+                journal_rows[idx],
+                result_r=r_val,
+                exit_reason=reason
+            )
+            st.toast("Result disimpan.")
+            st.rerun()
 
+    # ---------- ANALYTICS ----------
     st.divider()
-    df = pd.DataFrame(st.session_state.journal)
+    st.subheader("📈 Statistik Trade")
+
+    summary = analytics.summary()
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Trade (ada R)", summary["trades"])
+    m2.metric("Win Rate", f"{summary['win_rate']:.0%}")
+    m3.metric("Expectancy", f"{summary['expectancy_r']:+.2f}R")
+    m4.metric("Max DD", f"{summary['max_drawdown_r']:.1f}R")
+
+    with st.expander("Breakdown per Pair / Sumber / Bias Score", expanded=False):
+        for key, label in [
+            ("pair", "Per Pair"),
+            ("pair_source", "Per Sumber Pair"),
+            ("bias_score", "Per Bias Score")
+        ]:
+            st.markdown(f"**{label}**")
+            st.dataframe(
+                pd.DataFrame(analytics.breakdown(key)),
+                use_container_width=True,
+                hide_index=True
+            )
+
+    # ---------- JOURNAL (PAGINATED, TERBARU DULU) ----------
+    st.divider()
+    total_rows = len(journal_rows)
+    pages = max(1, -(-total_rows // JOURNAL_PAGE_SIZE))
+    page = st.number_input(f"Halaman jurnal (1–{pages})", min_value=1, max_value=pages, value=1)
+
+    end = total_rows - (page - 1) * JOURNAL_PAGE_SIZE
+    start = max(0, end - JOURNAL_PAGE_SIZE)
+    df = pd.DataFrame(journal_rows[start:end][::-1])
     st.dataframe(df, use_container_width=True)
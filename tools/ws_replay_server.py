@@ -0,0 +1,169 @@
+"""
+Stand-in WebSocket OKX lokal: memutar ulang frame rekaman (JSONL).
+
+Pakai:
+    python tools/ws_replay_server.py frames.jsonl --port 8765 --interval 0.05
+
+Lalu arahkan app:
+    OKX_WS_PUBLIC_URL=ws://127.0.0.1:8765 OKX_WS_BUSINESS_URL=ws://127.0.0.1:8765
+
+Frame bisa direkam dari stream asli lewat OKXStream(record_path=...).
+Hanya stdlib — cukup untuk text frame server→client dan
+membaca pesan subscribe / "ping" dari client.
+"""
+import argparse
+import base64
+import hashlib
+import json
+import socketserver
+import struct
+import threading
+import time
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# ==================================================
+# MINIMAL WEBSOCKET FRAMING
+# ==================================================
+def send_text(sock, text):
+    payload = text.encode()
+    header = bytes([0x81])
+    n = len(payload)
+    if n < 126:
+        header += bytes([n])
+    elif n < 65536:
+        header += bytes([126]) + struct.pack(">H", n)
+    else:
+        header += bytes([127]) + struct.pack(">Q", n)
+    sock.sendall(header + payload)
+
+def recv_exact(sock, n):
+    buf = b""
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("client closed")
+        buf += chunk
+    return buf
+
+def recv_frame(sock):
+    """Return (opcode, payload) dari frame client (selalu masked)."""
+    b1, b2 = recv_exact(sock, 2)
+    opcode = b1 & 0x0F
+    n = b2 & 0x7F
+    if n == 126:
+        n = struct.unpack(">H", recv_exact(sock, 2))[0]
+    elif n == 127:
+        n = struct.unpack(">Q", recv_exact(sock, 8))[0]
+    mask = recv_exact(sock, 4) if b2 & 0x80 else b"\x00" * 4
+    data = recv_exact(sock, n)
+    return opcode, bytes(c ^ mask[i % 4] for i, c in enumerate(data))
+
+# ==================================================
+# REPLAY HANDLER
+# ==================================================
+class ReplayHandler(socketserver.BaseRequestHandler):
+    frames = []
+    interval = 0.05
+
+    def handshake(self):
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = self.request.recv(4096)
+            if not chunk:
+                raise ConnectionError("no handshake")
+            request += chunk
+
+        key = ""
+        for line in request.decode().split("\r\n"):
+            if line.lower().startswith("sec-websocket-key:"):
+                key = line.split(":", 1)[1].strip()
+
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        self.request.sendall((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode())
+
+    def send(self, text):
+        with self.send_lock:
+            send_text(self.request, text)
+
+    def read_loop(self, subscribed):
+        try:
+            while True:
+                opcode, payload = recv_frame(self.request)
+                if opcode == 0x8:  # close
+                    return
+                if opcode == 0x9:  # ping protokol → pong
+                    with self.send_lock:
+                        self.request.sendall(bytes([0x8A, len(payload)]) + payload)
+                    continue
+
+                text = payload.decode()
+                if text == "ping":
+                    self.send("pong")
+                    continue
+
+                msg = json.loads(text)
+                if msg.get("op") == "subscribe":
+                    for arg in msg.get("args", []):
+                        subscribed.add((arg["channel"], arg["instId"]))
+                        self.send(json.dumps({"event": "subscribe", "arg": arg}))
+        except (ConnectionError, OSError):
+            pass  # client putus
+
+    def handle(self):
+        self.handshake()
+        self.send_lock = threading.Lock()
+        subscribed = set()
+        threading.Thread(target=self.read_loop, args=(subscribed,), daemon=True).start()
+
+        # Tunggu subscribe pertama sebelum mulai replay
+        deadline = time.monotonic() + 5
+        while not subscribed and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        try:
+            for frame in self.frames:
+                arg = json.loads(frame).get("arg", {})
+                # Kirim hanya channel yang di-subscribe client
+                if (arg.get("channel"), arg.get("instId")) in subscribed:
+                    self.send(frame)
+                time.sleep(self.interval)
+        except (ConnectionError, OSError):
+            pass
+
+class ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+def serve(frames_path, host="127.0.0.1", port=8765, interval=0.05):
+    with open(frames_path) as f:
+        ReplayHandler.frames = [line.strip() for line in f if line.strip()]
+    ReplayHandler.interval = interval
+
+    server = ThreadingServer((host, port), ReplayHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# ==================================================
+# CLI
+# ==================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay frame WebSocket OKX rekaman")
+    parser.add_argument("frames", help="file JSONL frame rekaman")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=0.05, help="jeda antar frame (detik)")
+    args = parser.parse_args()
+
+    srv = serve(args.frames, args.host, args.port, args.interval)
+    print(f"Replay {len(ReplayHandler.frames)} frame di ws://{args.host}:{args.port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        srv.shutdown()